@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+오류 분류기 마이크로 벤치마크
+기존 방식(전체 lower() + 패턴별 in 검사)과 ErrorClassifier를 수 MB 로그로 비교
+- str: 메모리에 있는 로그 전체를 한 번에 분류
+- stream: docker logs를 청크 단위로 읽으며 분류 (메모리 사용량 일정)
+- regex: 전체 패턴을 하나의 정규식 alternation으로 합친 경우 (참고용)
+
+사용법: python backend/bench_error_classifier.py [크기MB ...]
+"""
+
+import random
+import re
+import sys
+import time
+
+from error_classifier import DEFAULT_ERROR_PATTERNS, ErrorClassifier
+
+STREAM_CHUNK = 256 * 1024  # 스트림 청크 크기 (docker logs 스트림은 출력 단위로 더 작게 나뉨)
+WORDS = "INFO DEBUG processing batch record ok value step done loaded rows writing output elapsed".split()
+
+
+def legacy_match(logs):
+    """기존 analyze_error_type의 패턴 매칭 부분"""
+    logs_lower = logs.lower() if logs else ""
+    for name, _, patterns in DEFAULT_ERROR_PATTERNS:
+        for pattern in patterns:
+            if pattern in logs_lower:
+                return name
+    return None
+
+
+def make_log(size_mb, marker=None, position=0.5):
+    """패턴이 없는 로그를 만들고 필요하면 position 위치에 marker 줄을 삽입"""
+    random.seed(size_mb)
+    lines = []
+    size = 0
+    while size < size_mb * 1024 * 1024:
+        line = " ".join(random.choice(WORDS) for _ in range(12))
+        lines.append(line)
+        size += len(line) + 1
+    if marker:
+        lines.insert(int(len(lines) * position), marker)
+    return "\n".join(lines)
+
+
+def bench(fn, logs, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(logs)
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    sizes = [float(arg) for arg in sys.argv[1:]] or [4, 16]
+    classifier = ErrorClassifier()
+    regex = re.compile("|".join(re.escape(p) for _, _, ps in DEFAULT_ERROR_PATTERNS for p in ps), re.IGNORECASE)
+
+    cases = [
+        ("no match", None, 0.5),
+        ("script error at end", "Traceback (most recent call last):", 0.99),
+        ("permission at start", "open /data: Permission denied", 0.01),
+        ("timeout + permission", "read timeout ... then permission denied", 0.5),
+    ]
+
+    print(f"{'size':>6} {'case':<24} {'legacy ms':>10} {'str ms':>8} {'stream ms':>10} {'regex ms':>10}  result")
+    for size_mb in sizes:
+        for label, marker, position in cases:
+            logs = make_log(size_mb, marker, position)
+            chunks = [logs[i:i + STREAM_CHUNK] for i in range(0, len(logs), STREAM_CHUNK)]
+            legacy_ms, legacy_result = bench(legacy_match, logs)
+            str_ms, str_result = bench(lambda text: classifier.match([text]), logs)
+            stream_ms, stream_result = bench(classifier.match, chunks)
+            regex_ms, _ = bench(regex.search, logs, repeat=1)
+            assert legacy_result == str_result == stream_result, (label, legacy_result, str_result, stream_result)
+            print(f"{size_mb:>5}M {label:<24} {legacy_ms:>10.1f} {str_ms:>8.1f} {stream_ms:>10.1f} {regex_ms:>10.1f}  {str_result}")
+
+
+if __name__ == "__main__":
+    main()
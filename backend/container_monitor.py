@@ -3,132 +3,196 @@
 Container Monitor - 로컬에서 실행되는 모든 컨테이너를 감지하고 기록
 """
 
+import re
+import sys
 import time
 import subprocess
+import threading
 import requests
-import json
 import os
 from datetime import datetime
 import pytz
+from requests.adapters import HTTPAdapter
+from monitor_outbox import Outbox
+from monitor_state import ProcessedContainers
+from error_classifier import build_classifier
+from container_runtime import get_runtime, ContainerNotFound
 
 KST = pytz.timezone('Asia/Seoul')
 API_BASE = os.getenv("JOB_TRACKER_API_URL", "http://localhost:8000")
 
-# 이미 처리된 컨테이너 추적
-processed_containers = set()
+# 모니터링 방식: events (docker events 스트림) 또는 poll (5초 주기 docker ps)
+MONITOR_MODE = os.getenv("MONITOR_MODE", "events")
+# events 모드에서 누락 방지를 위한 전체 재동기화 주기 (초)
+RESYNC_INTERVAL = int(os.getenv("MONITOR_RESYNC_SECONDS", "300"))
+
+# 완료된 컨테이너에서 가져오는 로그 줄 수
+LOG_TAIL_LINES = 500
+
+# 모니터링 대상에서 제외할 시스템 컨테이너
+SYSTEM_CONTAINER_PREFIXES = ('job_management_', 'job_container_monitor', 'job_scheduler')
+# 스케줄러가 실행하는 컨테이너 (scheduled-{job}-{ts}-{run_id}, 실행 기록은 스케줄러가 직접 남김)
+SCHEDULED_CONTAINER_PREFIX = 'scheduled-'
+IGNORED_CONTAINER_PREFIXES = SYSTEM_CONTAINER_PREFIXES + (SCHEDULED_CONTAINER_PREFIX,)
+
+# Docker API 공용 연결 (CLI fork 대신 소켓 재사용)
+runtime = get_runtime()
 
 def get_container_info():
     """현재 실행 중인 모든 컨테이너 정보 조회"""
     try:
-        result = subprocess.run(
-            ["docker", "ps", "-a", "--format", "{{.Names}}\t{{.Status}}\t{{.ID}}\t{{.Image}}\t{{.CreatedAt}}"],
-            capture_output=True, text=True, check=True
-        )
-        
         containers = []
-        for line in result.stdout.strip().split('\n'):
-            if line:
-                parts = line.split('\t')
-                if len(parts) >= 5:
-                    name, status, container_id, image, created_at = parts
-                    
-                    # 시스템 컨테이너 제외
-                    if name.startswith(('job_management_', 'job_container_monitor', 'job_scheduler')):
-                        continue
-                        
-                    containers.append({
-                        'name': name,
-                        'status': status,
-                        'container_id': container_id,
-                        'image': image,
-                        'created_at': created_at
-                    })
+        for container in runtime.list_containers(all=True):
+            # 시스템 / 스케줄 실행 컨테이너 제외
+            if container.name.startswith(IGNORED_CONTAINER_PREFIXES):
+                continue
+                
+            containers.append({
+                'name': container.name,
+                'status': container.status,
+                'container_id': container.short_id,
+                'image': container.image,
+                'created_at': container.created
+            })
         return containers
     except Exception as e:
         print(f"Error getting container info: {e}")
         return []
 
+def parse_docker_time(value):
+    """docker inspect 시각 (RFC3339, 나노초) -> KST datetime (시작/종료 전이면 None)"""
+    if not value or value.startswith("0001-"):
+        return None
+    try:
+        value = re.sub(r"\.(\d+)", lambda m: "." + (m.group(1) + "000000")[:6], value.replace("Z", "+00:00"))
+        return datetime.fromisoformat(value).astimezone(KST)
+    except ValueError:
+        return None
+
+def container_times(name_or_id):
+    """inspect의 State.StartedAt / FinishedAt -> (시작 시각, 종료 시각) ISO 문자열 (모르면 None)"""
+    try:
+        state = runtime.inspect(name_or_id).get('State', {})
+    except Exception as e:
+        print(f"⚠️ Could not inspect {name_or_id} for run times: {e}")
+        return None, None
+    started, finished = parse_docker_time(state.get('StartedAt')), parse_docker_time(state.get('FinishedAt'))
+    return (started.isoformat() if started else None), (finished.isoformat() if finished else None)
+
+# 로그 기반 오류 분류기 (ErrorTypes 테이블 패턴으로 확장, 전체 동기화 때 갱신 주기가 지났으면 갱신)
+error_classifier = build_classifier()
+ERROR_TYPES_REFRESH_SECONDS = int(os.getenv("MONITOR_ERROR_TYPES_REFRESH_SECONDS", "300"))
+error_types_loaded_at = None  # 마지막 갱신 시도 시각 (monotonic)
+
+def refresh_error_classifier():
+    """API에서 ErrorTypes 패턴을 받아 분류기 재구성 (실패 시 기존 분류기 유지, 갱신 주기 안에서는 건너뜀)"""
+    global error_classifier, error_types_loaded_at
+    now = time.monotonic()
+    if error_types_loaded_at is not None and now - error_types_loaded_at < ERROR_TYPES_REFRESH_SECONDS:
+        return
+    error_types_loaded_at = now
+    try:
+        response = http.get(f"{API_BASE}/api/error-types", timeout=5)
+        if response.status_code == 200:
+            error_classifier = build_classifier(response.json())
+    except requests.RequestException as e:
+        print(f"⚠️ Could not load error types, using current patterns: {e}")
+
 def analyze_error_type(logs, exit_code):
     """로그 내용과 exit code를 분석해서 오류 유형 판단"""
+    return error_classifier.classify(logs, exit_code)
+
+def classify_container_logs(container_name, exit_code):
+    """컨테이너 전체 로그(stdout+stderr)를 스트림으로 읽으며 오류 유형 판단 (메모리 사용량 일정)"""
     if exit_code == 0:
-        return None  # 성공한 경우 오류 없음
-    
-    logs_lower = logs.lower() if logs else ""
-    
-    # 권한 오류 패턴
-    permission_patterns = [
-        'permission denied', 'access denied', 'forbidden', 
-        'unauthorized', 'not allowed', 'sudo required'
-    ]
-    
-    # 리소스 오류 패턴  
-    resource_patterns = [
-        'out of memory', 'memory limit', 'disk space', 'no space left',
-        'resource temporarily unavailable', 'cannot allocate memory',
-        'killed', 'oomkilled'
-    ]
-    
-    # 타임아웃 패턴
-    timeout_patterns = [
-        'timeout', 'timed out', 'connection timeout', 'read timeout',
-        'deadline exceeded', 'context deadline exceeded'
-    ]
+        return None
     
-    # 스크립트 오류 패턴 (일반적인 실행 오류)
-    script_patterns = [
-        'syntax error', 'import error', 'module not found', 'command not found',
-        'file not found', 'no such file', 'traceback', 'exception',
-        'error:', 'failed:', 'cannot'
-    ]
-    
-    # 패턴 매칭으로 오류 유형 판단
-    for pattern in permission_patterns:
-        if pattern in logs_lower:
-            return 'PERMISSION_ERROR'
-    
-    for pattern in resource_patterns:
-        if pattern in logs_lower:
-            return 'RESOURCE_ERROR'
-            
-    for pattern in timeout_patterns:
-        if pattern in logs_lower:
-            return 'TIMEOUT'
+    try:
+        stream = runtime.stream_logs(container_name)
+    except ContainerNotFound:
+        return error_classifier.classify(None, exit_code)
+    try:
+        return error_classifier.classify(stream, exit_code)
+    finally:
+        stream.close()  # 분류가 끝나면 나머지 로그는 읽지 않음
+
+# 처리된 컨테이너 추적 (LRU + 디스크, 재시작 후에도 유지)
+STATE_PATH = os.getenv("MONITOR_STATE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "monitor_state.db"))
+processed_containers = ProcessedContainers(STATE_PATH)
+processed_lock = threading.Lock()  # 이벤트 처리와 재동기화 스레드 간 중복 등록 방지
+
+# API로 전송 대기 중인 실행 기록 (디스크 outbox에 저장 후 배치 전송)
+BATCH_SIZE = int(os.getenv("MONITOR_BATCH_SIZE", "50"))
+FLUSH_INTERVAL = float(os.getenv("MONITOR_FLUSH_SECONDS", "2"))
+MAX_BACKOFF = 60  # 전송 실패 시 최대 대기 시간 (초)
+# 시작할 때 dead로 보관된 기록을 다시 전송 대상으로 되돌릴지 (API를 고친 뒤 재시작하면 다시 전송됨)
+REQUEUE_DEAD_ON_START = os.getenv("MONITOR_REQUEUE_DEAD", "true").lower() == "true"
+OUTBOX_PATH = os.getenv("MONITOR_OUTBOX_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "monitor_outbox.db"))
+outbox = Outbox(OUTBOX_PATH)
+outbox_ready = threading.Event()  # 배치가 찼을 때 sender 즉시 깨우기
+
+# keep-alive 커넥션 풀을 사용하는 HTTP 세션
+http = requests.Session()
+http.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+http.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+
+def queue_execution(record):
+    """완료된 실행 기록을 outbox에 저장 (전송은 sender 스레드가 담당)"""
+    outbox.append(record)
+    if outbox.size() >= BATCH_SIZE:
+        outbox_ready.set()
+
+def send_batch(entries):
+    """outbox 기록을 /api/executions/batch로 전송, 진행 여부 반환 (False면 백오프 후 재시도)
+
+    연결 실패 / 5xx는 API나 DB 장애로 보고 기록을 그대로 둔 채 재시도 (장애 중에 기록이 dead가 되지 않도록)
+    4xx로 거절되면 반으로 나눠 다시 보내서 문제 기록만 골라내고, 한 건만 남아도 거절되면 dead로 보관
+    """
+    ids = [entry_id for entry_id, _ in entries]
+    try:
+        response = http.post(f"{API_BASE}/api/executions/batch", json=[record for _, record in entries], timeout=30)
+    except requests.RequestException as e:
+        print(f"❌ Batch send failed ({len(entries)} records), will retry: {e}")
+        return False
     
-    for pattern in script_patterns:
-        if pattern in logs_lower:
-            return 'SCRIPT_ERROR'
+    if response.status_code == 200:
+        result = response.json()
+        outbox.ack(ids)
+        print(f"📤 Batch sent: {result['processed']} processed, {result['skipped']} skipped")
+        return True
     
-    # 특정 exit code 기반 판단
-    if exit_code == 125:  # Docker container error
-        return 'RESOURCE_ERROR'
-    elif exit_code == 126:  # Permission/execution error
-        return 'PERMISSION_ERROR'
-    elif exit_code == 127:  # Command not found
-        return 'SCRIPT_ERROR'
-    elif exit_code == 137:  # SIGKILL (OOM)
-        return 'RESOURCE_ERROR'
-    elif exit_code == 143:  # SIGTERM (timeout)
-        return 'TIMEOUT'
-    elif exit_code == 255:  # Docker daemon error
-        return 'RESOURCE_ERROR'
-    elif exit_code > 128:  # Signal-based termination
-        return 'RESOURCE_ERROR'
+    print(f"❌ Batch send failed ({response.status_code}, {len(entries)} records): {response.text[:200]}")
+    if response.status_code >= 500:
+        return False
+    if len(entries) > 1:
+        middle = len(entries) // 2
+        # 나눠 보내는 중에 서버 장애가 나면 나머지는 다음 재시도로 미룸
+        if not send_batch(entries[:middle]):
+            return False
+        return send_batch(entries[middle:])
     
-    # 기본값: 스크립트 오류
-    return 'SCRIPT_ERROR'
+    outbox.mark_dead(ids)
+    print(f"💀 Record {ids[0]} rejected, kept as dead (requeue with --requeue-dead)")
+    return True
 
-# 전역 변수로 처리된 컨테이너 추적
-processed_containers = set()
+def sender_loop():
+    """outbox를 비우는 전송 루프 (실패 시 지수 백오프)"""
+    backoff = 1
+    while True:
+        entries = outbox.peek(BATCH_SIZE)
+        if not entries:
+            outbox_ready.wait(FLUSH_INTERVAL)
+            outbox_ready.clear()
+            continue
+        
+        if send_batch(entries):
+            backoff = 1
+        else:
+            time.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
 
 def register_container_execution(container):
-    """컨테이너 실행을 시스템에 등록"""
-    global processed_containers
-    
-    # 로컬 중복 체크 (빠른 필터링)
-    container_key = f"{container['name']}-{container['container_id']}"
-    if container_key in processed_containers:
-        return
-    
+    """컨테이너 실행을 시스템에 등록 (중복 체크는 process_exited_container에서 처리)"""
     try:
         # 컨테이너가 종료된 경우만 기록 (완료된 실행)
         if not container['status'].startswith('Exited'):
@@ -136,18 +200,8 @@ def register_container_execution(container):
             
         print(f"🔍 Processing container: {container['name']} - {container['status']}")
         
-        # 이미 등록된 컨테이너인지 확인 (더 정확한 중복 체크)
-        check_response = requests.get(f"{API_BASE}/api/runs", timeout=10)
-        if check_response.status_code == 200:
-            existing_runs = check_response.json()
-            for run in existing_runs:
-                # 컨테이너 이름 + ID + 완료 상태로 정확한 중복 체크
-                if (run.get('job_name') == container['name'] and 
-                    run.get('container_id') == container['container_id'] and
-                    run.get('status') in ['SUCCESS', 'FAILED']):
-                    print(f"⏭️ Container {container['name']} (ID: {container['container_id'][:12]}) already processed")
-                    return
-            
+        # 이미 등록된 컨테이너는 배치 API에서 container_id 기준으로 건너뜀
+        
         # 컨테이너 실행 사용자 감지 (현재 로그인한 사용자)
         container_user = "system"  # 기본값
         try:
@@ -173,19 +227,26 @@ def register_container_execution(container):
         
         print(f"👤 Detected container user: {container_user}")
         
-        # Exit code 추출
-        exit_code = 0
-        if 'Exited (' in container['status']:
+        # Exit code 추출 (이벤트에서 받은 값이 있으면 우선 사용)
+        exit_code = container.get('exit_code', 0)
+        if 'exit_code' not in container and 'Exited (' in container['status']:
             try:
                 exit_code = int(container['status'].split('Exited (')[1].split(')')[0])
             except:
                 exit_code = 0
         
         # 컨테이너 로그 가져오기
-        log_result = subprocess.run(
-            ["docker", "logs", "--tail=500", container['name']],
-            capture_output=True, text=True
-        )
+        try:
+            logs = runtime.logs(container['name'], tail=LOG_TAIL_LINES)
+        except ContainerNotFound:
+            logs = ""
+        
+        # 시작 이벤트를 못 받았거나(구독 전부터 실행 중, 스트림 끊김) 재동기화로 찾은 경우 inspect 기준 시각 사용
+        started_at, finished_at = container.get('started_at'), container.get('finished_at')
+        if not started_at or not finished_at:
+            inspected_start, inspected_finish = container_times(container['container_id'])
+            started_at = started_at or inspected_start
+            finished_at = finished_at or inspected_finish
         
         # Job 자동 등록 데이터
         job_data = {
@@ -195,71 +256,46 @@ def register_container_execution(container):
             "image": container['image'],
             "user": container_user,  # 감지된 사용자 사용
             "hostname": "docker-host",
-            "started_at": datetime.now(KST).isoformat(),
+            "started_at": started_at or finished_at or datetime.now(KST).isoformat(),
             "container_id": container['container_id'],
             "container_name": container['name']
         }
         
-        print(f"📤 Registering to API: {API_BASE}/api/jobs/auto-register")
-        
-        # 시스템에 Job 등록
-        response = requests.post(f"{API_BASE}/api/jobs/auto-register", json=job_data, timeout=10)
-        print(f"📥 Registration response: {response.status_code}")
+        status = "SUCCESS" if exit_code == 0 else "FAILED"
+        record = {
+            "job": job_data,
+            "completion": {
+                "status": status,
+                "finished_at": finished_at or datetime.now(KST).isoformat(),
+                "exit_code": exit_code,
+                "result": logs[:5000] if logs else "No output"
+            }
+        }
         
-        if response.status_code == 200:
-            result = response.json()
-            run_id = result.get('run_id')
-            print(f"✅ Got run_id: {run_id}")
+        # 컨테이너 로그를 audit logs에 저장
+        if logs:
+            # 오류 유형 분석 (tail이 아닌 전체 로그 기준)
+            error_type = classify_container_logs(container['name'], exit_code)
+            
+            record["audit"] = {
+                "container_name": container['name'],
+                "logs": logs[:10000],  # 10KB 제한
+                "exit_code": exit_code,
+                "status": status,
+                "error_type": error_type  # 오류 유형 추가
+            }
             
-            if run_id:
-                # 실행 완료 처리
-                completion_data = {
-                    "status": "SUCCESS" if exit_code == 0 else "FAILED",
-                    "finished_at": datetime.now(KST).isoformat(),
-                    "exit_code": exit_code,
-                    "result": log_result.stdout[:5000] if log_result.stdout else "No output"
+            # 실패한 경우 JobRunErrors 테이블에도 기록
+            if exit_code != 0 and error_type:
+                record["error"] = {
+                    "error_type": error_type,
+                    "message": f"Container failed with exit code {exit_code}",
+                    "logs": logs[:5000]  # 5KB 제한
                 }
-                
-                complete_response = requests.put(f"{API_BASE}/api/runs/{run_id}/complete", json=completion_data, timeout=10)
-                print(f"✅ Completion response: {complete_response.status_code}")
-                
-                # 컨테이너 로그를 audit logs에 저장
-                if log_result.stdout:
-                    # 오류 유형 분석
-                    error_type = analyze_error_type(log_result.stdout, exit_code)
-                    
-                    audit_data = {
-                        "user": "system",
-                        "action_type": "CONTAINER_LOGS",
-                        "target_type": "job",
-                        "target_id": run_id,
-                        "details": {
-                            "container_name": container['name'],
-                            "logs": log_result.stdout[:10000],  # 10KB 제한
-                            "exit_code": exit_code,
-                            "status": "SUCCESS" if exit_code == 0 else "FAILED",
-                            "error_type": error_type  # 오류 유형 추가
-                        }
-                    }
-                    
-                    audit_response = requests.post(f"{API_BASE}/api/audit-logs", json=audit_data, timeout=10)
-                    print(f"📋 Audit log response: {audit_response.status_code}")
-                    
-                    # 실패한 경우 JobRunErrors 테이블에도 기록
-                    if exit_code != 0 and error_type:
-                        error_data = {
-                            "run_id": run_id,
-                            "error_type": error_type,
-                            "message": f"Container failed with exit code {exit_code}",
-                            "logs": log_result.stdout[:5000]  # 5KB 제한
-                        }
-                        
-                        error_response = requests.post(f"{API_BASE}/api/job-run-errors", json=error_data, timeout=10)
-                        print(f"🚨 Error log response: {error_response.status_code} (Type: {error_type})")
-                
-                print(f"✅ Registered container execution: {container['name']} (exit: {exit_code})")
-        else:
-            print(f"❌ Registration failed: {response.text}")
+        
+        # 배치로 모아서 전송
+        queue_execution(record)
+        print(f"📦 Queued container execution: {container['name']} (exit: {exit_code})")
         
     except Exception as e:
         import traceback
@@ -267,75 +303,191 @@ def register_container_execution(container):
         print(f"🔍 Container data: {container}")
         print(f"📋 Traceback: {traceback.format_exc()}")
 
-def main():
-    """메인 모니터링 루프"""
-    print("🔍 Container Monitor started - watching for completed containers")
-    print(f"🔗 API Base: {API_BASE}")
-    processed_containers = set()
+def process_exited_container(container):
+    """종료된 컨테이너를 한 번만 등록"""
+    container_key = f"{container['name']}-{container['container_id']}"
+    with processed_lock:
+        if processed_containers.contains(container_key):
+            return
+        register_container_execution(container)
+        processed_containers.add(container_key)
+
+def fetch_running_runs():
+    """RUNNING 실행 전체 조회 (/api/runs?status=RUNNING, X-Next-Cursor로 다음 페이지)"""
+    runs = []
+    params = {"status": "RUNNING", "limit": 500}
+    while True:
+        response = http.get(f"{API_BASE}/api/runs", params=params, timeout=5)
+        response.raise_for_status()
+        runs.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return runs
+        params["cursor"] = cursor
+
+def check_running_jobs(containers):
+    """RUNNING 상태인 작업들이 실제로는 종료되었는지 확인 (docker ps 스냅샷 1회와 메모리에서 조인)"""
+    try:
+        running_runs = fetch_running_runs()
+        print(f"🔍 Found {len(running_runs)} RUNNING jobs to check")
+        
+        # 컨테이너 ID / 이름 -> 컨테이너 매핑 (컨테이너별 docker ps 호출 대신)
+        by_id = {container['container_id']: container for container in containers}
+        by_name = {container['name']: container for container in containers}
+        
+        for run in running_runs:
+            run_id = run.get('run_id')
+            if run.get('run_type') == 'SCHEDULED':
+                # 스케줄 실행은 scheduled-{job}-... 컨테이너를 스케줄러가 직접 완료 처리
+                continue
+            if run.get('container_id'):
+                # 모니터가 등록한 실행은 자기 컨테이너로만 판단
+                container = by_id.get(run['container_id'][:12])
+            else:
+                # 수동 실행은 Job 이름과 같은 이름의 컨테이너
+                container = by_name.get(run.get('job_name'))
+            if not container:
+                continue
+            
+            container_name = container['name']
+            docker_status = container['status']
+            if not docker_status.startswith('Exited'):
+                continue
+            
+            print(f"🔄 Updating completed job: {container_name} (run_id: {run_id})")
+            # 완료 처리
+            exit_code = 0
+            if 'Exited (' in docker_status:
+                try:
+                    exit_code = int(docker_status.split('Exited (')[1].split(')')[0])
+                except:
+                    exit_code = 1
+            
+            # 상태가 바뀐 작업만 로그 가져오기 (tail 제한)
+            try:
+                logs = runtime.logs(container_name, tail=LOG_TAIL_LINES)
+            except ContainerNotFound:
+                logs = ""
+            
+            # 완료 API 호출
+            complete_data = {
+                "status": "SUCCESS" if exit_code == 0 else "FAILED",
+                "finished_at": datetime.now(KST).isoformat(),
+                "exit_code": exit_code,
+                "result": logs[:5000] if logs else "No output"
+            }
+            
+            complete_response = http.put(f"{API_BASE}/api/runs/{run_id}/complete", json=complete_data, timeout=10)
+            print(f"📝 Complete response: {complete_response.status_code}")
+            if complete_response.status_code != 200:
+                print(f"❌ Complete error: {complete_response.text}")
+    except Exception as e:
+        print(f"❌ Error checking running jobs: {e}")
+
+def sync_containers():
+    """전체 컨테이너를 스캔해서 종료된 컨테이너 등록 및 RUNNING 작업 확인"""
+    refresh_error_classifier()
+    containers = get_container_info()
+    
+    # high-water mark 이전에 생성된 컨테이너는 지난 스캔에서 이미 종료/처리된 것이므로 건너뜀
+    watermark = float(processed_containers.get_meta('created_watermark', 0))
+    
+    # 종료된 컨테이너 처리
+    pending_created = []
+    all_created = []
+    for container in containers:
+        created_ts = container['created_at']
+        if created_ts:
+            all_created.append(created_ts)
+        if created_ts and created_ts < watermark:
+            continue
+        if container['status'].startswith('Exited'):
+            process_exited_container(container)
+        elif created_ts:
+            pending_created.append(created_ts)
+    
+    # 아직 종료되지 않은 가장 오래된 컨테이너 생성 시각까지 watermark 전진
+    new_watermark = min(pending_created) if pending_created else max(all_created, default=watermark)
+    if new_watermark > watermark:
+        processed_containers.set_meta('created_watermark', new_watermark)
+    
+    check_running_jobs(containers)
+
+def handle_container_event(event, started_at):
+    """docker events의 start/die/destroy 이벤트 처리"""
+    actor = event.get('Actor', {})
+    attrs = actor.get('Attributes', {})
+    name = attrs.get('name', '')
+    if not name or name.startswith(IGNORED_CONTAINER_PREFIXES):
+        return
+    
+    container_id = event.get('id') or actor.get('ID', '')
+    action = event.get('Action') or event.get('status')
+    event_time = datetime.fromtimestamp(event.get('timeNano', event.get('time', 0) * 1e9) / 1e9, KST)
+    
+    if action == 'start':
+        started_at[container_id] = event_time
+        print(f"▶️ Container started: {name} at {event_time.strftime('%H:%M:%S.%f')[:-3]}")
+    elif action == 'die':
+        exit_code = int(attrs.get('exitCode', 0))
+        print(f"⏹️ Container died: {name} (exit: {exit_code}) at {event_time.strftime('%H:%M:%S.%f')[:-3]}")
+        process_exited_container({
+            'name': name,
+            'status': f"Exited ({exit_code})",
+            'container_id': container_id[:12],
+            'image': attrs.get('image', event.get('from', '')),
+            'created_at': None,
+            'started_at': started_at.pop(container_id).isoformat() if container_id in started_at else None,
+            'finished_at': event_time.isoformat(),
+            'exit_code': exit_code
+        })
+    elif action == 'destroy':
+        # die 없이 제거된 컨테이너 (생성만 되었거나 die를 놓친 경우)
+        started_at.pop(container_id, None)
+
+def resync_loop():
+    """events 모드의 안전장치: 주기적으로 전체 재동기화"""
+    while True:
+        try:
+            sync_containers()
+        except Exception as e:
+            print(f"❌ Resync error: {e}")
+        time.sleep(RESYNC_INTERVAL)
+
+def run_event_watch():
+    """docker events 스트림 구독 (연결이 끊기면 마지막 이벤트 시점부터 재구독)"""
+    threading.Thread(target=resync_loop, name="resync", daemon=True).start()
+    
+    started_at = {}  # container_id -> 시작 이벤트 시각
+    since = processed_containers.get_meta('events_since')  # 재시작 시 마지막 이벤트부터 재개
+    stream = None
     
     while True:
         try:
-            containers = get_container_info()
+            stream = runtime.events(since=since, filters={"type": "container", "event": ["start", "die", "destroy"]})
             
-            # 모든 종료된 컨테이너 처리
-            for container in containers:
-                if container['status'].startswith('Exited'):
-                    container_key = f"{container['name']}-{container['id']}"
-                    if container_key not in processed_containers:
-                        register_container_execution(container)
-                        processed_containers.add(container_key)
+            for event in stream:
+                handle_container_event(event, started_at)
+                since = str(event.get('time', since))
+                processed_containers.set_meta('events_since', since)
             
-            # RUNNING 상태인 작업들이 실제로는 종료되었는지 확인
-            try:
-                response = requests.get(f"{API_BASE}/api/runs", timeout=5)
-                if response.status_code == 200:
-                    runs = response.json()
-                    running_runs = [run for run in runs if run.get('status') == 'RUNNING']
-                    print(f"🔍 Found {len(running_runs)} RUNNING jobs to check")
-                    
-                    for run in running_runs:
-                        container_name = run.get('job_name')
-                        run_id = run.get('run_id')
-                        print(f"🔍 Checking container: {container_name} (run_id: {run_id})")
-                        
-                        # Docker에서 실제 상태 확인
-                        result = subprocess.run(
-                            ["docker", "ps", "-a", "--filter", f"name={container_name}", "--format", "{{.Status}}"],
-                            capture_output=True, text=True
-                        )
-                        
-                        docker_status = result.stdout.strip()
-                        print(f"🐳 Docker status for {container_name}: {docker_status}")
-                        
-                        if docker_status.startswith('Exited'):
-                            print(f"🔄 Updating completed job: {container_name} (run_id: {run_id})")
-                            # 완료 처리
-                            exit_code = 0
-                            if 'Exited (' in docker_status:
-                                try:
-                                    exit_code = int(docker_status.split('Exited (')[1].split(')')[0])
-                                except:
-                                    exit_code = 1
-                            
-                            # 로그 가져오기
-                            log_result = subprocess.run(["docker", "logs", container_name], capture_output=True, text=True)
-                            
-                            # 완료 API 호출
-                            complete_data = {
-                                "status": "SUCCESS" if exit_code == 0 else "FAILED",
-                                "finished_at": datetime.now(KST).isoformat(),
-                                "exit_code": exit_code,
-                                "result": log_result.stdout[:5000] if log_result.stdout else "No output"
-                            }
-                            
-                            complete_response = requests.put(f"{API_BASE}/api/runs/{run_id}/complete", json=complete_data, timeout=10)
-                            print(f"📝 Complete response: {complete_response.status_code}")
-                            if complete_response.status_code != 200:
-                                print(f"❌ Complete error: {complete_response.text}")
-                        else:
-                            print(f"⏳ Container {container_name} still running: {docker_status}")
-            except Exception as e:
-                print(f"❌ Error checking running jobs: {e}")
+            print("⚠️ docker events stream ended, reconnecting...")
+            time.sleep(1)
+            
+        except KeyboardInterrupt:
+            if stream is not None and hasattr(stream, 'close'):
+                stream.close()
+            print("\n🛑 Container Monitor stopped")
+            break
+        except Exception as e:
+            print(f"❌ Error watching docker events: {e}")
+            time.sleep(5)
+
+def run_polling():
+    """5초 주기 docker ps 폴링"""
+    while True:
+        try:
+            sync_containers()
             
             # 5초마다 체크
             time.sleep(5)
@@ -346,5 +498,28 @@ def main():
         except Exception as e:
             time.sleep(60)
 
+def main():
+    """메인 모니터링 루프"""
+    print("🔍 Container Monitor started - watching for completed containers")
+    print(f"🔗 API Base: {API_BASE}")
+    print(f"📡 Mode: {MONITOR_MODE}")
+    
+    if REQUEUE_DEAD_ON_START:
+        requeued = outbox.requeue_dead()
+        if requeued:
+            print(f"♻️ Requeued {requeued} dead outbox records")
+    print(f"📮 Outbox: {OUTBOX_PATH} ({outbox.size()} pending, {outbox.dead_count()} dead)")
+    
+    threading.Thread(target=sender_loop, name="sender", daemon=True).start()
+    
+    if MONITOR_MODE == "poll":
+        run_polling()
+    else:
+        run_event_watch()
+
 if __name__ == "__main__":
-    main()
+    if "--requeue-dead" in sys.argv[1:]:
+        # 모니터는 그대로 두고 dead 기록만 되돌림 (실행 중인 sender가 다음 주기에 전송)
+        print(f"♻️ Requeued {outbox.requeue_dead()} dead outbox records")
+    else:
+        main()
@@ -0,0 +1,424 @@
+"""
+Job Management System - 컨테이너 런타임 공통 모듈
+docker CLI를 매번 fork하는 대신 Docker SDK로 소켓 연결을 유지하며 구조화된 결과를 반환
+(main.py, scheduler.py, container_monitor.py 공용, 테스트용 FakeRuntime 포함)
+"""
+
+import asyncio
+import codecs
+import functools
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# 런타임 선택: docker (기본) 또는 fake (메모리, 테스트용)
+CONTAINER_RUNTIME = os.getenv("CONTAINER_RUNTIME", "docker")
+DOCKER_TIMEOUT = int(os.getenv("DOCKER_TIMEOUT", "60"))  # 일반 API 호출 타임아웃 (초)
+DOCKER_MAX_POOL_SIZE = int(os.getenv("DOCKER_MAX_POOL_SIZE", "20"))  # 소켓 커넥션 풀 크기
+DOCKER_API_WORKERS = int(os.getenv("DOCKER_API_WORKERS", "16"))  # async 호출용 전용 스레드 수
+# 시간 초과 후에도 끝나지 않은 Docker 호출 수 상한 (넘으면 새 호출은 스레드를 잡지 않고 바로 실패)
+DOCKER_MAX_HUNG_CALLS = int(os.getenv("DOCKER_MAX_HUNG_CALLS", str(max(1, DOCKER_API_WORKERS // 2))))
+DOCKER_WAIT_WORKERS = int(os.getenv("DOCKER_WAIT_WORKERS", "4"))  # 동기화 대기 등 Docker 호출이 아닌 대기용 스레드 수
+
+
+class ContainerNotFound(Exception):
+    """컨테이너가 존재하지 않음"""
+
+
+class ContainerRuntimeError(Exception):
+    """컨테이너 런타임 호출 실패"""
+
+
+class ContainerTimeout(ContainerRuntimeError):
+    """컨테이너 런타임 호출 시간 초과"""
+
+
+@dataclass
+class ContainerInfo:
+    id: str
+    name: str
+    image: str
+    state: str  # running, exited, created, paused, restarting, dead ...
+    status: str  # docker ps의 Status 문자열 (예: "Exited (1) 2 minutes ago")
+    created: float  # 생성 시각 (unix timestamp)
+    exit_code: Optional[int] = None
+
+    @property
+    def short_id(self):
+        return self.id[:12]
+
+
+def parse_since(since):
+    """since 값을 SDK가 받는 형태로 변환 (unix timestamp, ISO 문자열, 10m/2h/30s 같은 상대 시간)"""
+    if since is None or isinstance(since, (int, float)):
+        return since
+    if isinstance(since, datetime):
+        return since.timestamp()
+    since = str(since).strip()
+    if re.fullmatch(r"\d+(\.\d+)?", since):
+        return float(since)
+    match = re.fullmatch(r"(\d+)([smhd])", since)
+    if match:
+        seconds = int(match.group(1)) * {"s": 1, "m": 60, "h": 3600, "d": 86400}[match.group(2)]
+        return time.time() - seconds
+    return datetime.fromisoformat(since.replace("Z", "+00:00")).timestamp()
+
+
+def parse_exit_code(status):
+    """Status 문자열에서 exit code 추출 (예: "Exited (137) 5 seconds ago" -> 137)"""
+    match = re.search(r"Exited \((-?\d+)\)", status or "")
+    return int(match.group(1)) if match else None
+
+
+def decode_stream(chunks):
+    """bytes 청크 스트림을 str 청크로 변환 (청크 경계의 멀티바이트 문자 처리)"""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    try:
+        for chunk in chunks:
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+    finally:
+        # 중간에 close()되면 HTTP 스트림도 바로 닫음
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+class LogStream:
+    """stream_logs 반환값: str 청크 이터레이터
+
+    close()는 하위 HTTP 스트림을 바로 닫으므로 다른 스레드에서 불러도
+    읽고 있던 스레드의 follow가 풀림 (제너레이터 close()는 실행 중에는 불가)
+    """
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.chunks = decode_stream(raw)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.chunks)
+
+    def close(self):
+        if hasattr(self.raw, "close"):
+            self.raw.close()
+
+
+class DockerRuntime:
+    """Docker SDK 기반 런타임 (소켓 커넥션 재사용)"""
+
+    def __init__(self):
+        import docker
+        self.errors = docker.errors
+        self.client = docker.from_env(timeout=DOCKER_TIMEOUT, max_pool_size=DOCKER_MAX_POOL_SIZE)
+        # follow 로그 / wait는 오래 걸리므로 타임아웃 없는 별도 클라이언트 사용
+        self.stream_client = docker.from_env(timeout=None, max_pool_size=DOCKER_MAX_POOL_SIZE)
+
+    def _call(self, fn, *args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except self.errors.NotFound as e:
+            raise ContainerNotFound(str(e)) from e
+        except self.errors.DockerException as e:
+            raise ContainerRuntimeError(str(e)) from e
+
+    def list_containers(self, all=True, name=None) -> List[ContainerInfo]:
+        """컨테이너 목록 (API 호출 1회, name은 부분 일치 필터)"""
+        filters = {"name": name} if name else None
+        rows = self._call(self.client.api.containers, all=all, filters=filters)
+        return [
+            ContainerInfo(
+                id=row["Id"],
+                name=(row.get("Names") or ["/"])[0].lstrip("/"),
+                image=row.get("Image", ""),
+                state=row.get("State", ""),
+                status=row.get("Status", ""),
+                created=row.get("Created", 0),
+                exit_code=parse_exit_code(row.get("Status")),
+            )
+            for row in rows
+        ]
+
+    def inspect(self, name_or_id) -> Dict:
+        """docker inspect 결과 (없으면 ContainerNotFound)"""
+        return self._call(self.client.api.inspect_container, name_or_id)
+
+    def inspect_many(self, names_or_ids) -> Dict[str, Dict]:
+        """여러 컨테이너 inspect (같은 커넥션 재사용, 없는 컨테이너는 제외)"""
+        result = {}
+        for name_or_id in names_or_ids:
+            try:
+                result[name_or_id] = self.inspect(name_or_id)
+            except ContainerNotFound:
+                continue
+        return result
+
+    def logs(self, name_or_id, tail=None, since=None, timestamps=False) -> str:
+        """로그 조회 (stdout + stderr)"""
+        output = self._call(
+            self.client.api.logs, name_or_id,
+            tail=tail if tail is not None else "all",
+            since=parse_since(since), timestamps=timestamps
+        )
+        return output.decode("utf-8", errors="replace")
+
+    def stream_logs(self, name_or_id, follow=False, since=None, timestamps=False, tail=None):
+        """로그를 str 청크 스트림으로 반환 (follow=True면 컨테이너 종료까지 계속)"""
+        stream = self._call(
+            self.stream_client.api.logs, name_or_id, stream=True, follow=follow,
+            since=parse_since(since), timestamps=timestamps,
+            tail=tail if tail is not None else "all"
+        )
+        return LogStream(stream)
+
+    def run(self, image, name, detach=True) -> str:
+        """컨테이너 생성 후 시작 (이미지가 없으면 pull), 컨테이너 ID 반환"""
+        container = self._call(self.client.containers.run, image, name=name, detach=detach)
+        return container.id
+
+    def wait(self, name_or_id) -> int:
+        """컨테이너 종료까지 대기 후 exit code 반환"""
+        result = self._call(self.stream_client.api.wait, name_or_id)
+        return result.get("StatusCode", -1)
+
+    def stop(self, name_or_id, timeout=10):
+        self._call(self.client.api.stop, name_or_id, timeout=timeout)
+
+    def remove(self, name_or_id, force=False):
+        self._call(self.client.api.remove_container, name_or_id, force=force)
+
+    def events(self, since=None, filters=None):
+        """docker events 스트림 (dict)"""
+        return self._call(self.stream_client.api.events, since=parse_since(since), filters=filters, decode=True)
+
+
+@dataclass
+class FakeContainer:
+    id: str
+    name: str
+    image: str
+    state: str = "running"
+    exit_code: Optional[int] = None
+    logs: str = ""
+    created: float = field(default_factory=time.time)
+
+
+class FakeRuntime:
+    """메모리 기반 가짜 런타임 (테스트용)
+
+    run()으로 만든 컨테이너는 run_results[image] = (exit_code, logs)에 지정한 결과로 바로 종료됨
+    """
+
+    def __init__(self):
+        self.containers: Dict[str, FakeContainer] = {}
+        self.run_results = {}
+        self.event_log = []
+        self.lock = threading.Lock()
+
+    def add_container(self, name, image, state="exited", exit_code=0, logs=""):
+        """테스트용 컨테이너 추가"""
+        container_id = uuid.uuid4().hex * 2
+        with self.lock:
+            self.containers[container_id] = FakeContainer(container_id, name, image, state, exit_code, logs)
+            self.event_log.append({"Type": "container", "Action": "start", "id": container_id,
+                                   "time": int(time.time()), "timeNano": time.time_ns(),
+                                   "Actor": {"ID": container_id, "Attributes": {"name": name, "image": image}}})
+            if state == "exited":
+                self.event_log.append({"Type": "container", "Action": "die", "id": container_id,
+                                       "time": int(time.time()), "timeNano": time.time_ns(),
+                                       "Actor": {"ID": container_id, "Attributes": {
+                                           "name": name, "image": image, "exitCode": str(exit_code)}}})
+        return container_id
+
+    def _find(self, name_or_id) -> FakeContainer:
+        with self.lock:
+            for container in self.containers.values():
+                if name_or_id in (container.name, container.id) or container.id.startswith(name_or_id):
+                    return container
+        raise ContainerNotFound(f"No such container: {name_or_id}")
+
+    def _status(self, container):
+        if container.state == "running":
+            return "Up Less than a second"
+        if container.state == "exited":
+            return f"Exited ({container.exit_code}) Less than a second ago"
+        return container.state.capitalize()
+
+    def list_containers(self, all=True, name=None) -> List[ContainerInfo]:
+        with self.lock:
+            containers = list(self.containers.values())
+        return [
+            ContainerInfo(c.id, c.name, c.image, c.state, self._status(c), c.created,
+                          c.exit_code if c.state == "exited" else None)
+            for c in containers
+            if (all or c.state == "running") and (not name or name in c.name)
+        ]
+
+    def inspect(self, name_or_id) -> Dict:
+        c = self._find(name_or_id)
+        return {"Id": c.id, "Name": f"/{c.name}", "Config": {"Image": c.image},
+                "State": {"Status": c.state, "Running": c.state == "running", "ExitCode": c.exit_code or 0,
+                          "StartedAt": datetime.utcfromtimestamp(c.created).isoformat() + "Z",
+                          "FinishedAt": (datetime.utcfromtimestamp(c.created).isoformat() + "Z"
+                                         if c.state == "exited" else "0001-01-01T00:00:00Z")}}
+
+    def inspect_many(self, names_or_ids) -> Dict[str, Dict]:
+        result = {}
+        for name_or_id in names_or_ids:
+            try:
+                result[name_or_id] = self.inspect(name_or_id)
+            except ContainerNotFound:
+                continue
+        return result
+
+    def logs(self, name_or_id, tail=None, since=None, timestamps=False) -> str:
+        lines = self._find(name_or_id).logs.splitlines(keepends=True)
+        if tail is not None:
+            lines = lines[-tail:] if tail else []
+        return "".join(lines)
+
+    def stream_logs(self, name_or_id, follow=False, since=None, timestamps=False, tail=None):
+        return LogStream([self.logs(name_or_id, tail=tail).encode()])
+
+    def run(self, image, name, detach=True) -> str:
+        if any(c.name == name for c in self.containers.values()):
+            raise ContainerRuntimeError(f"Conflict. The container name \"/{name}\" is already in use")
+        exit_code, logs = self.run_results.get(image, (None, ""))
+        state = "running" if exit_code is None else "exited"
+        return self.add_container(name, image, state=state, exit_code=exit_code, logs=logs)
+
+    def wait(self, name_or_id) -> int:
+        container = self._find(name_or_id)
+        if container.state == "running":
+            container.state, container.exit_code = "exited", 0
+        return container.exit_code
+
+    def stop(self, name_or_id, timeout=10):
+        container = self._find(name_or_id)
+        if container.state == "running":
+            container.state, container.exit_code = "exited", 143
+
+    def remove(self, name_or_id, force=False):
+        container = self._find(name_or_id)
+        if container.state == "running" and not force:
+            raise ContainerRuntimeError(f"You cannot remove a running container {container.id}")
+        with self.lock:
+            del self.containers[container.id]
+
+    def events(self, since=None, filters=None):
+        # docker와 같이 since가 없으면 과거 이벤트는 보내지 않음 (스트림은 바로 끝남)
+        if since is None:
+            return iter([])
+        since = parse_since(since)
+        return iter([e for e in list(self.event_log) if e["time"] >= since])
+
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime():
+    """프로세스 공용 런타임 (처음 호출 시 연결)"""
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = FakeRuntime() if CONTAINER_RUNTIME == "fake" else DockerRuntime()
+    return _runtime
+
+
+class AsyncRuntime:
+    """async 엔드포인트용 런타임 래퍼
+
+    Docker 호출을 전용 스레드 풀에서 실행하고 timeout을 걸어서,
+    느린 docker stop 등이 웹 서버 스레드 풀이나 이벤트 루프를 잡고 있지 않도록 함
+    timeout은 기다리는 쪽만 끊고 실행 중인 스레드는 Docker 호출이 끝날 때까지 남으므로,
+    이런 호출이 max_hung개 이상이면 새 호출은 풀을 더 막지 않도록 바로 ContainerTimeout
+    """
+
+    def __init__(self, runtime_factory=None, max_workers=DOCKER_API_WORKERS, max_hung=DOCKER_MAX_HUNG_CALLS,
+                 wait_workers=DOCKER_WAIT_WORKERS):
+        self.runtime_factory = runtime_factory or get_runtime
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="docker-api")
+        # Docker API를 부르지 않는 대기 작업용 (Docker 호출 스레드를 차지하지 않도록 분리)
+        self.wait_executor = ThreadPoolExecutor(max_workers=wait_workers, thread_name_prefix="docker-wait")
+        self.max_hung = max_hung
+        self.hung = 0  # 시간 초과 후에도 아직 실행 중인 호출 수
+        self.lock = threading.Lock()
+
+    async def run_blocking(self, fn, *args, call_timeout=DOCKER_TIMEOUT, **kwargs):
+        """임의의 blocking 함수를 Docker 전용 스레드 풀에서 실행"""
+        name = getattr(fn, '__name__', 'docker call')
+        with self.lock:
+            if self.hung >= self.max_hung:
+                raise ContainerTimeout(f"Docker API is not responding ({self.hung} calls still hung), {name} not started")
+        future = self.executor.submit(functools.partial(fn, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), call_timeout)
+        except asyncio.TimeoutError:
+            # 아직 시작 전이던 호출은 취소되고, 실행 중이던 호출은 끝날 때까지 hung으로 셈
+            if not future.done():
+                with self.lock:
+                    self.hung += 1
+                future.add_done_callback(self._hung_finished)
+            raise ContainerTimeout(f"{name} timed out after {call_timeout}s")
+
+    def _hung_finished(self, future):
+        with self.lock:
+            self.hung -= 1
+
+    async def run_waiting(self, fn, *args, call_timeout, **kwargs):
+        """Docker 호출이 아닌 blocking 대기 (예: 동기화 완료 대기)를 별도 스레드 풀에서 실행"""
+        future = self.wait_executor.submit(functools.partial(fn, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), call_timeout)
+        except asyncio.TimeoutError:
+            raise ContainerTimeout(f"{getattr(fn, '__name__', 'wait')} timed out after {call_timeout}s")
+
+    async def call(self, method, *args, call_timeout=DOCKER_TIMEOUT, **kwargs):
+        """런타임 메서드 호출 (예: await aruntime.call("inspect", name))"""
+        return await self.run_blocking(getattr(self.runtime_factory(), method), *args, call_timeout=call_timeout, **kwargs)
+
+    async def list_containers(self, all=True, name=None):
+        return await self.call("list_containers", all=all, name=name)
+
+    async def inspect(self, name_or_id):
+        return await self.call("inspect", name_or_id)
+
+    async def logs(self, name_or_id, tail=None, since=None, timestamps=False):
+        return await self.call("logs", name_or_id, tail=tail, since=since, timestamps=timestamps)
+
+    async def run(self, image, name):
+        # 이미지 pull이 필요할 수 있어 일반 호출보다 여유를 둠
+        return await self.call("run", image, name=name, call_timeout=DOCKER_TIMEOUT * 5)
+
+    async def stop(self, name_or_id, timeout=10):
+        # 컨테이너 정지 대기 시간 + API 호출 시간
+        return await self.call("stop", name_or_id, timeout=timeout, call_timeout=timeout + DOCKER_TIMEOUT)
+
+    async def remove(self, name_or_id, force=False):
+        return await self.call("remove", name_or_id, force=force)
+
+
+_async_runtime = None
+
+
+def get_async_runtime():
+    """프로세스 공용 async 런타임"""
+    global _async_runtime
+    if _async_runtime is None:
+        with _runtime_lock:
+            if _async_runtime is None:
+                _async_runtime = AsyncRuntime()
+    return _async_runtime
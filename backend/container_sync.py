@@ -0,0 +1,259 @@
+"""
+Job Management System - 컨테이너 → DB 백그라운드 동기화
+Docker 컨테이너 목록을 Jobs 테이블에 반영하고 GET /api/containers가 바로 응답할 수 있는
+메모리 스냅샷을 유지 (docker events로 즉시, 그 외에는 주기적으로 동기화)
+"""
+
+import os
+import threading
+import time
+
+from sqlalchemy import text, bindparam
+
+from reference_cache import reference_cache
+
+# 이벤트가 없어도 동기화하는 주기 (초)
+CONTAINER_SYNC_SECONDS = float(os.getenv("CONTAINER_SYNC_SECONDS", "15"))
+# 이벤트가 연속으로 올 때 모아서 한 번만 동기화하는 시간 (초)
+CONTAINER_SYNC_DEBOUNCE = float(os.getenv("CONTAINER_SYNC_DEBOUNCE", "0.5"))
+
+# 다중 행 INSERT / IN (...) 한 번에 처리할 최대 행 수
+SYNC_BATCH_SIZE = 500
+
+# 동기화가 필요한 컨테이너 이벤트
+SYNC_EVENTS = ["create", "start", "die", "stop", "destroy", "rename"]
+# 이벤트 스트림 재구독 대기 시간 최대값 (초, 1초부터 두 배씩 늘림)
+EVENT_RETRY_MAX_SECONDS = float(os.getenv("CONTAINER_SYNC_EVENT_RETRY_MAX", "60"))
+# 이벤트 없이 바로 끝난 스트림이 이 횟수만큼 연속되면 구독을 멈추고 주기 동기화만 사용
+EVENT_EMPTY_LIMIT = int(os.getenv("CONTAINER_SYNC_EVENT_EMPTY_LIMIT", "5"))
+
+
+def container_status(state):
+    """Docker 상태 -> (container_status, is_active)"""
+    if state in ('running', 'paused'):
+        return "RUNNING", True
+    if state == 'exited':
+        return "STOPPED", False
+    if state == 'created':
+        return "CREATED", False
+    return "UNKNOWN", False
+
+
+class ContainerSync:
+    """컨테이너 동기화 워커와 최신 스냅샷"""
+
+    def __init__(self, session_factory, runtime_factory, interval=CONTAINER_SYNC_SECONDS, on_change=None):
+        self.session_factory = session_factory
+        self.runtime_factory = runtime_factory
+        self.interval = interval
+        self.on_change = on_change  # (바뀐 항목 목록, 사라진 job_id 목록) -> 스냅샷이 바뀔 때 호출
+        self.containers = []  # 마지막으로 동기화된 /api/containers 응답
+        self.synced_at = None  # 마지막 동기화 성공 시각 (unix timestamp)
+        self.last_error = None
+        self.requested = 0  # 동기화 요청 번호
+        self.completed = 0  # 마지막으로 끝난 동기화가 처리한 요청 번호
+        self.wakeup = threading.Event()
+        self.cond = threading.Condition()
+        self.started = False
+
+    def start(self):
+        """동기화 스레드와 docker events 구독 스레드 시작 (한 번만)"""
+        if self.started:
+            return
+        self.started = True
+        threading.Thread(target=self._sync_loop, name="container-sync", daemon=True).start()
+        threading.Thread(target=self._event_loop, name="container-sync-events", daemon=True).start()
+
+    def snapshot(self):
+        """(컨테이너 목록, 스냅샷 나이(초), 마지막 오류)"""
+        with self.cond:
+            age = time.time() - self.synced_at if self.synced_at else None
+            return self.containers, age, self.last_error
+
+    def request_sync(self, timeout=None):
+        """즉시 동기화 요청 (timeout이 있으면 요청 이후의 동기화가 끝날 때까지 대기)"""
+        with self.cond:
+            self.requested += 1
+            request_id = self.requested
+            self.wakeup.set()
+            if timeout:
+                self.cond.wait_for(lambda: self.completed >= request_id, timeout=timeout)
+
+    def _sync_loop(self):
+        while True:
+            with self.cond:
+                self.wakeup.clear()
+                serving = self.requested
+            try:
+                self.sync_once()
+            except Exception as e:
+                print(f"❌ Container sync error: {e}")
+                with self.cond:
+                    self.last_error = str(e)
+            with self.cond:
+                self.completed = serving
+                self.cond.notify_all()
+            if self.wakeup.wait(self.interval):
+                time.sleep(CONTAINER_SYNC_DEBOUNCE)
+
+    def _event_loop(self):
+        """컨테이너 상태가 바뀌면 바로 동기화 요청 (끊기면 점점 늘어나는 간격으로 재구독)"""
+        delay = 1
+        empty = 0
+        while True:
+            try:
+                received = False
+                for _ in self.runtime_factory().events(filters={"type": "container", "event": SYNC_EVENTS}):
+                    received = True
+                    self.wakeup.set()
+                if received:
+                    delay, empty = 1, 0
+                else:
+                    empty += 1
+                    if empty >= EVENT_EMPTY_LIMIT:
+                        print("⚠️ Container sync event stream keeps ending without events, interval sync only")
+                        return
+                print(f"⚠️ Container sync event stream ended, reconnecting in {delay:g}s...")
+            except Exception as e:
+                print(f"⚠️ Container sync events unavailable, interval sync only for {delay:g}s: {e}")
+            time.sleep(delay)
+            delay = min(delay * 2, EVENT_RETRY_MAX_SECONDS)
+
+    def sync_once(self):
+        """Docker 컨테이너 목록을 Jobs에 반영하고 스냅샷 교체"""
+        containers = {}
+        for container in self.runtime_factory().list_containers(all=True):
+            status, is_active = container_status(container.state)
+            containers[container.name] = {
+                "name": container.name,
+                "status": status,
+                "is_active": is_active,
+                "container_id": container.short_id,
+                "image": container.image
+            }
+
+        db = self.session_factory()
+        try:
+            self.upsert_jobs(db, list(containers.values()))
+
+            # DB에서 job 정보 조회
+            result = db.execute(
+                text("""
+                    SELECT j.job_id, j.name, j.description, jt.name as type_name,
+                           u.username, j.is_active, j.created_at
+                    FROM Jobs j
+                    JOIN JobTypes jt ON j.type_id = jt.type_id
+                    LEFT JOIN Users u ON j.owner_id = u.user_id
+                    ORDER BY j.created_at DESC
+                """)
+            ).fetchall()
+
+            # 컨테이너가 없는 Job들은 제거 대상
+            jobs_to_remove = []
+            result_list = []
+            for row in result:
+                container = containers.get(row[1])
+                if not container:
+                    jobs_to_remove.append(row[0])
+                    continue
+                result_list.append({
+                    "job_id": row[0],
+                    "name": row[1],
+                    "description": row[2],
+                    "type_name": row[3],
+                    "username": row[4],
+                    "is_active": row[5],
+                    "created_at": row[6].isoformat() if row[6] else None,
+                    "container_status": container["status"],
+                    "container_id": container["container_id"],
+                    "docker_image": container["image"]
+                })
+
+            for start in range(0, len(jobs_to_remove), SYNC_BATCH_SIZE):
+                self.remove_jobs(db, jobs_to_remove[start:start + SYNC_BATCH_SIZE])
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        with self.cond:
+            previous = self.containers
+            self.containers = result_list
+            self.synced_at = time.time()
+            self.last_error = None
+
+        if self.on_change:
+            self.publish_changes(previous, result_list)
+
+    def publish_changes(self, previous, current):
+        """이전 스냅샷과 비교해 바뀐 항목만 on_change로 전달"""
+        before = {item["job_id"]: item for item in previous}
+        changed = [item for item in current if before.get(item["job_id"]) != item]
+        current_ids = {item["job_id"] for item in current}
+        removed = [job_id for job_id in before if job_id not in current_ids]
+        if changed or removed:
+            try:
+                self.on_change(changed, removed)
+            except Exception as e:
+                print(f"⚠️ Container sync change listener error: {e}")
+
+    def upsert_jobs(self, db, containers):
+        """컨테이너 목록을 Jobs에 반영 (배치마다 다중 행 INSERT ... ON DUPLICATE KEY UPDATE 1회)"""
+        if not containers:
+            return
+        # 타입/소유자 ID는 컨테이너마다 서브쿼리로 찾지 않고 캐시에서 조회
+        type_id = reference_cache.get(db, "JobTypes", "CONTAINER")
+        owner_id = reference_cache.get(db, "Users", "system")
+
+        for start in range(0, len(containers), SYNC_BATCH_SIZE):
+            batch = containers[start:start + SYNC_BATCH_SIZE]
+            params = {"type_id": type_id, "owner_id": owner_id}
+            rows = []
+            for i, container in enumerate(batch):
+                rows.append(f"(UUID(), :name_{i}, :description_{i}, :type_id, :owner_id, :docker_image_{i}, :is_active_{i}, NOW())")
+                params[f"name_{i}"] = container["name"]
+                params[f"description_{i}"] = f"Auto-detected container: {container['image']}"
+                params[f"docker_image_{i}"] = container["image"]
+                params[f"is_active_{i}"] = container["is_active"]
+
+            # 새 컨테이너는 삽입, 기존 job은 상태와 이미지만 업데이트 (uq_jobs_name 기준)
+            db.execute(
+                text(f"""
+                    INSERT INTO Jobs (job_id, name, description, type_id, owner_id, docker_image, is_active, created_at)
+                    VALUES {", ".join(rows)}
+                    AS new
+                    ON DUPLICATE KEY UPDATE is_active = new.is_active, docker_image = new.docker_image
+                """),
+                params
+            )
+
+    def remove_jobs(self, db, job_ids):
+        """컨테이너가 사라진 Job들과 관련 데이터 삭제 (테이블마다 1회)"""
+        ids = {"job_ids": job_ids}
+
+        # 감사 로그 기록 (Job 삭제 전에 한 번에 기록)
+        db.execute(text("""
+            INSERT INTO AuditLogs (user_id, action_type, target_type, target_id, before_value)
+            SELECT :user_id, 'AUTO_DELETE', 'job', j.job_id, JSON_OBJECT('reason', 'Container not found')
+            FROM Jobs j
+            WHERE j.job_id IN :job_ids
+        """).bindparams(bindparam("job_ids", expanding=True)), {**ids, "user_id": reference_cache.get(db, "Users", "system")})
+
+        # 관련 데이터 순서대로 삭제
+        for query in (
+            "DELETE FROM JobRunErrors WHERE run_id IN (SELECT run_id FROM JobRuns WHERE job_id IN :job_ids)",
+            "DELETE FROM JobRunLogs WHERE run_id IN (SELECT run_id FROM JobRuns WHERE job_id IN :job_ids)",
+            "DELETE FROM JobRunLogChunks WHERE run_id IN (SELECT run_id FROM JobRuns WHERE job_id IN :job_ids)",
+            "DELETE FROM JobRuns WHERE job_id IN :job_ids",
+            "DELETE FROM JobRunStatsSketch WHERE job_id IN :job_ids",
+            "DELETE FROM JobRunErrorStats WHERE job_id IN :job_ids",
+            "DELETE FROM JobRunStats WHERE job_id IN :job_ids",
+            "DELETE FROM JobSchedules WHERE job_id IN :job_ids",
+            "DELETE FROM Jobs WHERE job_id IN :job_ids",
+        ):
+            db.execute(text(query).bindparams(bindparam("job_ids", expanding=True)), ids)
+
+        print(f"🗑️ Auto-removed {len(job_ids)} jobs (container not found)")
@@ -0,0 +1,128 @@
+"""
+Container Monitor - 로그 기반 오류 유형 분류기
+패턴을 한 번만 컴파일해두고, 로그를 청크 단위 스트림으로 한 번만 읽으면서 우선순위대로 분류
+"""
+
+# 기본 오류 패턴 (priority가 낮을수록 우선)
+DEFAULT_ERROR_PATTERNS = [
+    # 권한 오류 패턴
+    ('PERMISSION_ERROR', 10, [
+        'permission denied', 'access denied', 'forbidden',
+        'unauthorized', 'not allowed', 'sudo required'
+    ]),
+    # 리소스 오류 패턴
+    ('RESOURCE_ERROR', 20, [
+        'out of memory', 'memory limit', 'disk space', 'no space left',
+        'resource temporarily unavailable', 'cannot allocate memory',
+        'killed', 'oomkilled'
+    ]),
+    # 타임아웃 패턴
+    ('TIMEOUT', 30, [
+        'timeout', 'timed out', 'connection timeout', 'read timeout',
+        'deadline exceeded', 'context deadline exceeded'
+    ]),
+    # 스크립트 오류 패턴 (일반적인 실행 오류)
+    ('SCRIPT_ERROR', 40, [
+        'syntax error', 'import error', 'module not found', 'command not found',
+        'file not found', 'no such file', 'traceback', 'exception',
+        'error:', 'failed:', 'cannot'
+    ]),
+]
+
+# 로그 패턴이 없을 때 exit code 기반 판단
+EXIT_CODE_ERROR_TYPES = {
+    125: 'RESOURCE_ERROR',    # Docker container error
+    126: 'PERMISSION_ERROR',  # Permission/execution error
+    127: 'SCRIPT_ERROR',      # Command not found
+    137: 'RESOURCE_ERROR',    # SIGKILL (OOM)
+    143: 'TIMEOUT',           # SIGTERM (timeout)
+    255: 'RESOURCE_ERROR',    # Docker daemon error
+}
+
+
+class ErrorClassifier:
+    """우선순위별 패턴 집합을 컴파일한 분류기"""
+
+    def __init__(self, categories=DEFAULT_ERROR_PATTERNS):
+        # 같은 이름은 합치고, 우선순위 순으로 정렬
+        # (패턴은 정의된 순서를 유지: 자주 나오는 패턴을 먼저 검사)
+        merged = {}
+        for name, priority, patterns in categories:
+            entry = merged.setdefault(name, [priority, []])
+            entry[0] = min(entry[0], priority)
+            entry[1].extend(p.lower() for p in patterns if p and p.lower() not in entry[1])
+        ordered = sorted(merged.items(), key=lambda item: item[1][0])
+
+        # 같거나 더 높은 우선순위의 다른 패턴을 포함하는 패턴은 결과에 영향이 없으므로 제거
+        # (예: 'oomkilled'는 'killed', 'read timeout'은 'timeout'이 먼저 매칭됨)
+        seen = []
+        self.categories = []
+        for name, (priority, patterns) in ordered:
+            candidates = seen + patterns
+            kept = tuple(
+                p for p in patterns
+                if not any(q != p and q in p for q in candidates)
+            )
+            seen.extend(kept)
+            self.categories.append((name, kept))
+
+        # 청크 경계에 걸친 패턴을 찾기 위해 이전 청크 끝부분을 이어붙임
+        self.overlap = max((len(p) for p in seen), default=1) - 1
+
+    def match(self, chunks):
+        """로그 청크 스트림에서 가장 우선순위가 높은 오류 유형 반환 (없으면 None)"""
+        best = len(self.categories)
+        tail = ''
+        for chunk in chunks:
+            text = tail + chunk.lower()
+            # 이미 찾은 것보다 우선순위가 높은 유형만 확인
+            for i in range(best):
+                if any(p in text for p in self.categories[i][1]):
+                    best = i
+                    break
+            if best == 0:
+                break  # 최우선 유형을 찾으면 나머지 로그는 읽지 않음
+            tail = text[-self.overlap:] if self.overlap else ''
+        return self.categories[best][0] if best < len(self.categories) else None
+
+    def classify(self, logs, exit_code):
+        """로그 내용(문자열 또는 청크 iterable)과 exit code로 오류 유형 판단"""
+        if exit_code == 0:
+            return None  # 성공한 경우 오류 없음
+
+        if logs is None:
+            chunks = []
+        elif isinstance(logs, str):
+            chunks = [logs]  # 이미 메모리에 있는 로그는 나누지 않음
+        else:
+            chunks = logs
+
+        error_type = self.match(chunks)
+        if error_type:
+            return error_type
+
+        # 특정 exit code 기반 판단
+        if exit_code in EXIT_CODE_ERROR_TYPES:
+            return EXIT_CODE_ERROR_TYPES[exit_code]
+        if exit_code > 128:  # Signal-based termination
+            return 'RESOURCE_ERROR'
+
+        # 기본값: 스크립트 오류
+        return 'SCRIPT_ERROR'
+
+
+def build_classifier(error_types=None):
+    """기본 패턴 + ErrorTypes 테이블의 패턴으로 분류기 생성
+
+    error_types: /api/error-types 응답 ([{"name", "priority", "patterns"}])
+    """
+    categories = list(DEFAULT_ERROR_PATTERNS)
+    default_priority = {name: priority for name, priority, _ in DEFAULT_ERROR_PATTERNS}
+    for row in error_types or []:
+        if not row.get('patterns'):
+            continue
+        priority = row.get('priority')
+        if priority is None:
+            priority = default_priority.get(row['name'], 100)
+        categories.append((row['name'], priority, row['patterns']))
+    return ErrorClassifier(categories)
@@ -0,0 +1,267 @@
+"""
+Job Management System - 실시간 이벤트 피드
+실행 상태 변경 / 새 Audit 로그 / Job 변경을 SSE로 브라우저에 push
+(탭마다 5초 폴링하던 전체 조회 대신, 서버 프로세스당 하나의 변경 감시가 델타만 전달)
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+
+import pytz
+from sqlalchemy import text
+
+KST = pytz.timezone('Asia/Seoul')
+
+# 변경 감시 주기 (초), 쓰기 API에서는 notify()로 바로 깨움
+CHANGE_FEED_SECONDS = float(os.getenv("CHANGE_FEED_SECONDS", "2"))
+# 재접속(Last-Event-ID) 시 이어서 보낼 수 있는 최근 이벤트 수
+EVENT_HISTORY_SIZE = int(os.getenv("EVENT_HISTORY_SIZE", "1000"))
+# 구독자 한 명이 밀려 있을 수 있는 최대 이벤트 수 (넘으면 reset을 보내 전체 재조회)
+EVENT_BUFFER_SIZE = int(os.getenv("EVENT_BUFFER_SIZE", "1000"))
+# 새 이벤트가 없을 때 연결 유지용 heartbeat 간격 (초)
+EVENT_HEARTBEAT = float(os.getenv("EVENT_HEARTBEAT", "15"))
+# 한 번에 읽는 Audit 로그 / 실행 수
+CHANGE_FEED_BATCH = 500
+# 늦게 커밋된 Audit 로그를 기다리는 시간 (초): audit_id는 INSERT 시점에 정해지고 커밋 순서는 다를 수 있어서
+# 빈 audit_id는 이 시간 동안 다시 확인 (롤백된 INSERT도 빈 번호를 남기므로 이후에는 포기)
+AUDIT_GAP_SECONDS = float(os.getenv("AUDIT_GAP_SECONDS", "60"))
+# 추적하는 빈 audit_id 최대 개수 (AUTO_INCREMENT가 크게 건너뛴 경우)
+AUDIT_MAX_GAPS = 1000
+# 최근 시작/종료된 실행을 다시 훑는 구간 (초): 다른 프로세스에서 감시 주기 사이에 시작하고 끝난 실행도 잡음
+RUN_WINDOW_SECONDS = float(os.getenv("CHANGE_FEED_RUN_WINDOW", "60"))
+
+
+def format_sse(event_id, event_type, data):
+    """SSE 메시지 한 개"""
+    id_line = f"id: {event_id}\n" if event_id else ""
+    return f"{id_line}event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+class EventSubscriber:
+    """구독자 한 명의 버퍼 (publish 스레드가 채우고 이벤트 루프에서 꺼냄)"""
+
+    def __init__(self, loop, max_events=EVENT_BUFFER_SIZE):
+        self.loop = loop
+        self.max_events = max_events
+        self.events = []
+        self.overflowed = False
+        self.lock = threading.Lock()
+        self.ready = asyncio.Event()
+
+    def push(self, event):
+        with self.lock:
+            if len(self.events) >= self.max_events:
+                # 밀린 이벤트는 버리고 클라이언트가 전체를 다시 조회하게 함
+                self.events.clear()
+                self.overflowed = True
+            else:
+                self.events.append(event)
+        try:
+            self.loop.call_soon_threadsafe(self.ready.set)
+        except RuntimeError:
+            pass
+
+    async def get(self, timeout=EVENT_HEARTBEAT):
+        """쌓인 이벤트를 한 번에 꺼냄 -> (이벤트 목록, reset 필요 여부), timeout이면 None"""
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self.ready.clear()
+        with self.lock:
+            events, self.events = self.events, []
+            overflowed, self.overflowed = self.overflowed, False
+            return events, overflowed
+
+
+class EventHub:
+    """프로세스 내 브로드캐스트 허브 (어느 스레드에서든 publish 가능)
+
+    이벤트 ID는 "{프로세스 ID}-{번호}" 형식이라 서버가 재시작되면 이어받지 않고 reset
+    """
+
+    def __init__(self, history_size=EVENT_HISTORY_SIZE):
+        self.boot_id = uuid.uuid4().hex[:8]
+        self.seq = 0
+        self.history = deque(maxlen=history_size)
+        self.subscribers = set()
+        self.lock = threading.Lock()
+
+    def publish(self, event_type, data):
+        with self.lock:
+            self.seq += 1
+            event = (f"{self.boot_id}-{self.seq}", event_type, data)
+            self.history.append((self.seq, event))
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            subscriber.push(event)
+
+    def subscribe(self, loop, last_event_id=None):
+        """구독 시작 -> (구독자, 놓친 이벤트 목록), 이어받을 수 없으면 놓친 이벤트 자리에 None"""
+        subscriber = EventSubscriber(loop)
+        with self.lock:
+            replay = []
+            if last_event_id:
+                boot_id, _, seq = last_event_id.partition("-")
+                oldest = self.history[0][0] if self.history else self.seq + 1
+                if boot_id != self.boot_id or not seq.isdigit() or int(seq) < oldest - 1:
+                    replay = None
+                else:
+                    replay = [event for event_seq, event in self.history if event_seq > int(seq)]
+            # 히스토리 조회와 등록을 같은 lock 안에서 해서 그 사이 이벤트가 빠지지 않음
+            self.subscribers.add(subscriber)
+        return subscriber, replay
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def subscriber_count(self):
+        with self.lock:
+            return len(self.subscribers)
+
+
+class ChangeFeed:
+    """DB 변경 감시 -> EventHub로 run / audit 이벤트 발행
+
+    스케줄러처럼 다른 프로세스가 쓴 변경도 잡기 위해 구독자가 있는 동안 주기적으로 확인
+    - 새 Audit 로그: audit_id(AUTO_INCREMENT) 워터마크 이후 행만 조회
+    - 실행 상태: RUNNING 실행 ID 집합을 비교해 시작/종료된 실행만 다시 조회
+    - 최근 시작/종료된 실행: RUN_WINDOW_SECONDS 구간을 겹쳐서 다시 훑고 (상태, 종료 시각)이 바뀐 실행만 발행
+    쿼리 수는 구독자(탭) 수와 관계없이 주기당 3~4개
+    """
+
+    def __init__(self, session_factory, hub, fetch_runs, fetch_audit_logs_after, interval=CHANGE_FEED_SECONDS):
+        self.session_factory = session_factory
+        self.hub = hub
+        self.fetch_runs = fetch_runs  # (db, run_ids) -> 실행 dict 목록
+        self.fetch_audit_logs_after = fetch_audit_logs_after  # (db, audit_id, limit) -> Audit 로그 dict 목록
+        self.interval = interval
+        self.primed = False
+        self.audit_watermark = 0  # 이 번호까지는 모두 발행했거나 포기함
+        self.audit_high = 0  # 지금까지 본 가장 큰 audit_id
+        self.audit_seen = set()  # audit_watermark 이후 이미 발행한 audit_id
+        self.audit_gaps = {}  # 아직 안 보인 audit_id -> 처음 발견한 시각 (monotonic)
+        self.running = set()
+        self.recent_runs = {}  # 최근 구간의 run_id -> (상태, 종료 시각)
+        self.pending_runs = set()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.started = False
+
+    def start(self):
+        if self.started:
+            return
+        self.started = True
+        threading.Thread(target=self._loop, name="change-feed", daemon=True).start()
+
+    def notify(self, run_ids=()):
+        """쓰기 API에서 커밋 후 호출 (바뀐 실행 ID를 알면 함께 전달)"""
+        with self.lock:
+            self.pending_runs.update(run_id for run_id in run_ids if run_id)
+        self.wakeup.set()
+
+    def _loop(self):
+        while True:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            if not self.hub.subscriber_count():
+                # 보는 사람이 없으면 조회하지 않고, 다시 생기면 그 시점부터 감시
+                self.primed = False
+                with self.lock:
+                    self.pending_runs.clear()
+                continue
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"❌ Change feed error: {e}")
+
+    def poll_once(self):
+        db = self.session_factory()
+        try:
+            if not self.primed:
+                self.audit_watermark = db.execute(text("SELECT COALESCE(MAX(audit_id), 0) FROM AuditLogs")).scalar()
+                self.audit_high = self.audit_watermark
+                self.audit_seen, self.audit_gaps = set(), {}
+                self.running = self._running_run_ids(db)
+                self.recent_runs = self._recent_runs(db)
+                self.primed = True
+                return
+
+            self._poll_audit_logs(db)
+
+            running = self._running_run_ids(db)
+            recent = self._recent_runs(db)
+            with self.lock:
+                changed = (running ^ self.running) | self.pending_runs
+                self.pending_runs = set()
+            changed |= {run_id for run_id, state in recent.items() if self.recent_runs.get(run_id) != state}
+            self.running = running
+            self.recent_runs = recent
+
+            changed = list(changed)
+            for start in range(0, len(changed), CHANGE_FEED_BATCH):
+                batch = changed[start:start + CHANGE_FEED_BATCH]
+                found = set()
+                for run in self.fetch_runs(db, batch):
+                    found.add(run["run_id"])
+                    self.hub.publish("run", run)
+                for run_id in batch:
+                    if run_id not in found:
+                        self.hub.publish("run.deleted", {"run_id": run_id})
+        finally:
+            db.close()
+
+    def _poll_audit_logs(self, db):
+        """워터마크 이후 Audit 로그 중 아직 발행하지 않은 행 발행 (빈 번호는 AUDIT_GAP_SECONDS 동안 다시 확인)"""
+        after = self.audit_watermark
+        while True:
+            audit_logs = self.fetch_audit_logs_after(db, after, CHANGE_FEED_BATCH)
+            for audit_log in audit_logs:
+                audit_id = audit_log["audit_id"]
+                if audit_id not in self.audit_seen:
+                    self.audit_seen.add(audit_id)
+                    self.audit_gaps.pop(audit_id, None)
+                    self.hub.publish("audit", audit_log)
+                after = audit_id
+            if len(audit_logs) < CHANGE_FEED_BATCH:
+                break
+
+        now = time.monotonic()
+        # 새로 본 범위의 빈 번호 기록 (먼저 INSERT된 트랜잭션이 아직 커밋 전일 수 있음)
+        for audit_id in range(self.audit_high + 1, after):
+            if len(self.audit_gaps) >= AUDIT_MAX_GAPS:
+                break
+            if audit_id not in self.audit_seen:
+                self.audit_gaps[audit_id] = now
+        self.audit_high = max(self.audit_high, after)
+        for audit_id, noticed_at in list(self.audit_gaps.items()):
+            if now - noticed_at > AUDIT_GAP_SECONDS:
+                del self.audit_gaps[audit_id]
+
+        # 가장 오래된 빈 번호 직전까지만 워터마크 전진
+        self.audit_watermark = min(self.audit_gaps) - 1 if self.audit_gaps else self.audit_high
+        self.audit_seen = {audit_id for audit_id in self.audit_seen if audit_id > self.audit_watermark}
+
+    def _recent_runs(self, db):
+        """최근 구간에 시작했거나 종료된 실행 -> {run_id: (상태, 종료 시각)} (JobRuns 시각은 KST 기준)"""
+        since = datetime.now(KST).replace(tzinfo=None) - timedelta(seconds=max(RUN_WINDOW_SECONDS, self.interval * 3))
+        rows = db.execute(
+            text("""
+                SELECT run_id, status, finished_at FROM JobRuns WHERE started_at >= :since
+                UNION
+                SELECT run_id, status, finished_at FROM JobRuns WHERE finished_at >= :since
+            """),
+            {"since": since}
+        ).fetchall()
+        return {row[0]: (row[1], row[2]) for row in rows}
+
+    def _running_run_ids(self, db):
+        rows = db.execute(text("SELECT run_id FROM JobRuns WHERE status = 'RUNNING'")).fetchall()
+        return {row[0] for row in rows}
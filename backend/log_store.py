@@ -0,0 +1,239 @@
+"""
+Job Management System - 압축 청크 로그 저장소
+실행 로그를 고정 크기(압축 전 기준) zlib 청크로 JobRunLogChunks에 (run_id, seq) 단위로 저장
+각 청크에 로그 전체 기준 바이트/줄 오프셋을 같이 저장해서 범위 조회, tail 조회, 스트리밍 다운로드 시
+필요한 청크만 읽고 압축을 풂 (로그를 자르지 않고 전부 보관)
+"""
+
+import os
+import zlib
+
+from sqlalchemy import text
+
+# 청크 크기 (압축 전 바이트), 마지막 청크만 이보다 작을 수 있음
+LOG_STORE_CHUNK_BYTES = int(os.getenv("LOG_STORE_CHUNK_BYTES", str(256 * 1024)))
+LOG_STORE_COMPRESS_LEVEL = int(os.getenv("LOG_STORE_COMPRESS_LEVEL", "6"))
+# 스트리밍 읽기 시 한 번에 가져오는 청크 수
+LOG_STORE_READ_BATCH = 8
+
+CODEC_ZLIB = "zlib"
+
+
+def compress(data):
+    return zlib.compress(data, LOG_STORE_COMPRESS_LEVEL)
+
+
+def decompress(codec, data):
+    if codec != CODEC_ZLIB:
+        raise ValueError(f"Unknown log chunk codec: {codec}")
+    return zlib.decompress(data)
+
+
+def to_bytes(data):
+    return data.encode("utf-8") if isinstance(data, str) else data
+
+
+class LogWriter:
+    """실행 하나의 로그를 이어 쓰는 writer (커밋은 호출한 쪽에서)
+
+    아직 덜 찬 마지막 청크는 flush할 때마다 같은 seq로 덮어써서
+    실행 중에도 최신 로그가 보이고 완료 후에는 모든 청크가 고정 크기가 됨
+    """
+
+    def __init__(self, db, run_id):
+        self.db = db
+        self.run_id = run_id
+        self.buffer = bytearray()
+        # 이미 저장된 로그 뒤에 이어서 씀 (마지막 청크가 덜 찼으면 그 청크부터 다시 채움)
+        last = db.execute(
+            text("""
+                SELECT seq, byte_offset, line_offset, byte_count, codec, data
+                FROM JobRunLogChunks WHERE run_id = :run_id
+                ORDER BY seq DESC LIMIT 1
+            """),
+            {"run_id": run_id}
+        ).fetchone()
+        if last is None:
+            self.seq, self.byte_offset, self.line_offset = 0, 0, 0
+        elif last[3] < LOG_STORE_CHUNK_BYTES:
+            self.seq, self.byte_offset, self.line_offset = last[0], last[1], last[2]
+            self.buffer.extend(decompress(last[4], last[5]))
+        else:
+            self.seq, self.byte_offset = last[0] + 1, last[1] + last[3]
+            self.line_offset = last[2] + decompress(last[4], last[5]).count(b"\n")
+        self.written = 0  # 이번 writer로 추가한 바이트 수
+
+    def write(self, data):
+        data = to_bytes(data)
+        if not data:
+            return
+        self.buffer.extend(data)
+        self.written += len(data)
+        # 꽉 찬 청크는 바로 확정
+        while len(self.buffer) >= LOG_STORE_CHUNK_BYTES:
+            chunk = bytes(self.buffer[:LOG_STORE_CHUNK_BYTES])
+            del self.buffer[:LOG_STORE_CHUNK_BYTES]
+            self._save(chunk)
+            self.seq += 1
+            self.byte_offset += len(chunk)
+            self.line_offset += chunk.count(b"\n")
+
+    def flush(self):
+        """덜 찬 마지막 청크 저장 (같은 seq로 덮어씀)"""
+        if self.buffer:
+            self._save(bytes(self.buffer))
+
+    def _save(self, chunk):
+        self.db.execute(
+            text("""
+                INSERT INTO JobRunLogChunks
+                    (run_id, seq, byte_offset, line_offset, byte_count, line_count, codec, data)
+                VALUES (:run_id, :seq, :byte_offset, :line_offset, :byte_count, :line_count, :codec, :data)
+                AS new
+                ON DUPLICATE KEY UPDATE byte_count = new.byte_count, line_count = new.line_count,
+                                        codec = new.codec, data = new.data
+            """),
+            {
+                "run_id": self.run_id,
+                "seq": self.seq,
+                "byte_offset": self.byte_offset,
+                "line_offset": self.line_offset,
+                "byte_count": len(chunk),
+                "line_count": chunk.count(b"\n"),
+                "codec": CODEC_ZLIB,
+                "data": compress(chunk),
+            }
+        )
+
+
+def append_log(db, run_id, data):
+    """로그 전체를 한 번에 추가 (커밋은 호출한 쪽에서)"""
+    if not data:
+        return
+    writer = LogWriter(db, run_id)
+    writer.write(data)
+    writer.flush()
+
+
+def log_summary(db, run_id):
+    """{size, lines, chunks, compressed_size} (청크가 없으면 None)
+
+    lines는 줄바꿈 수 + 줄바꿈으로 끝나지 않은 마지막 줄
+    """
+    row = db.execute(
+        text("""
+            SELECT COUNT(*), COALESCE(SUM(byte_count), 0), COALESCE(SUM(line_count), 0),
+                   COALESCE(SUM(LENGTH(data)), 0)
+            FROM JobRunLogChunks WHERE run_id = :run_id
+        """),
+        {"run_id": run_id}
+    ).fetchone()
+    if not row or not row[0]:
+        return None
+    chunks, size, newlines, compressed_size = (int(value) for value in row)
+    last = db.execute(
+        text("SELECT codec, data FROM JobRunLogChunks WHERE run_id = :run_id ORDER BY seq DESC LIMIT 1"),
+        {"run_id": run_id}
+    ).fetchone()
+    ends_with_newline = decompress(last[0], last[1]).endswith(b"\n")
+    return {
+        "size": size,
+        "lines": newlines + (0 if ends_with_newline or size == 0 else 1),
+        "chunks": chunks,
+        "compressed_size": compressed_size,
+    }
+
+
+def _iter_chunks(session_factory, run_id, condition="", params=None, descending=False):
+    """조건에 맞는 청크를 seq 순서대로 (seq, byte_offset, line_offset, 압축 푼 데이터) 로 반환
+
+    LOG_STORE_READ_BATCH개씩 끊어서 조회하므로 메모리에는 몇 개 청크만 올라감
+    """
+    db = session_factory()
+    try:
+        last_seq = None
+        order = "DESC" if descending else "ASC"
+        while True:
+            query_params = {"run_id": run_id, "limit": LOG_STORE_READ_BATCH, **(params or {})}
+            after = ""
+            if last_seq is not None:
+                after = "AND seq < :last_seq" if descending else "AND seq > :last_seq"
+                query_params["last_seq"] = last_seq
+            rows = db.execute(
+                text(f"""
+                    SELECT seq, byte_offset, line_offset, codec, data
+                    FROM JobRunLogChunks
+                    WHERE run_id = :run_id {condition} {after}
+                    ORDER BY seq {order}
+                    LIMIT :limit
+                """),
+                query_params
+            ).fetchall()
+            # 다음 배치를 읽기 전에 트랜잭션을 끝내 커넥션을 오래 잡지 않음
+            db.rollback()
+            for row in rows:
+                yield row[0], row[1], row[2], decompress(row[3], row[4])
+            if len(rows) < LOG_STORE_READ_BATCH:
+                return
+            last_seq = rows[-1][0]
+    finally:
+        db.close()
+
+
+def stream_log(session_factory, run_id, start=0, end=None):
+    """바이트 범위 [start, end) 를 청크 단위로 스트리밍 (end가 None이면 끝까지)"""
+    condition = "AND byte_offset + byte_count > :start"
+    params = {"start": start}
+    if end is not None:
+        condition += " AND byte_offset < :end"
+        params["end"] = end
+    for _, byte_offset, _, data in _iter_chunks(session_factory, run_id, condition, params):
+        begin = max(0, start - byte_offset)
+        stop = len(data) if end is None else min(len(data), end - byte_offset)
+        if begin < stop:
+            yield data[begin:stop]
+
+
+def read_lines(session_factory, run_id, start_line, count):
+    """start_line(0부터)부터 count줄 -> str 목록"""
+    if count <= 0:
+        return []
+    lines = []
+    partial = b""
+    # start_line 번째 줄이 시작되는 청크부터 (그 앞 청크는 읽지 않음)
+    condition = "AND line_offset + line_count >= :start_line"
+    skip = None
+    for _, _, line_offset, data in _iter_chunks(session_factory, run_id, condition, {"start_line": start_line}):
+        if skip is None:
+            skip = start_line - line_offset  # 첫 청크에서 건너뛸 줄바꿈 수
+        parts = (partial + data).split(b"\n")
+        partial = parts.pop()
+        for part in parts:
+            if skip > 0:
+                skip -= 1
+                continue
+            lines.append(part.decode("utf-8", errors="replace"))
+            if len(lines) >= count:
+                return lines
+        if skip > 0:
+            # 청크 경계에 걸친 줄 앞부분은 아직 건너뛰는 중
+            partial = b""
+    if partial and skip == 0 and len(lines) < count:
+        lines.append(partial.decode("utf-8", errors="replace"))
+    return lines
+
+
+def tail_lines(session_factory, run_id, count):
+    """마지막 count줄 -> str 목록 (뒤쪽 청크부터 필요한 만큼만 읽음)"""
+    if count <= 0:
+        return []
+    data = b""
+    for _, _, _, chunk in _iter_chunks(session_factory, run_id, descending=True):
+        data = chunk + data
+        # 마지막 줄이 줄바꿈으로 끝날 수 있어서 count+1개 이상의 줄바꿈이 모이면 충분
+        if data.count(b"\n") > count:
+            break
+    lines = data.split(b"\n")
+    if lines and lines[-1] == b"":
+        lines.pop()
+    return [line.decode("utf-8", errors="replace") for line in lines[-count:]]
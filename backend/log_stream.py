@@ -0,0 +1,256 @@
+"""
+Job Management System - 컨테이너 로그 follow 스트리밍
+컨테이너마다 docker logs --follow 스트림을 하나만 열고 여러 뷰어에게 나눠줌
+(뷰어마다 버퍼 크기가 정해져 있어 느린 뷰어가 있어도 서버 메모리는 일정)
+"""
+
+import asyncio
+import calendar
+import json
+import os
+import re
+import threading
+import time
+
+# 뷰어 한 명이 밀려 있을 수 있는 최대 줄 수 (넘으면 오래된 줄부터 버리고 lagged 이벤트 전송)
+LOG_STREAM_BUFFER_LINES = int(os.getenv("LOG_STREAM_BUFFER_LINES", "1000"))
+# 재접속(since / Last-Event-ID) 시 다시 보내는 최대 줄 수
+LOG_STREAM_MAX_BACKLOG = int(os.getenv("LOG_STREAM_MAX_BACKLOG", "5000"))
+# 새 줄이 없을 때 연결 유지용 heartbeat 간격 (초)
+LOG_STREAM_HEARTBEAT = float(os.getenv("LOG_STREAM_HEARTBEAT", "15"))
+# follow 스트림이 열릴 때까지 지난 로그 조회를 미루는 최대 시간 (초)
+LOG_STREAM_CONNECT_TIMEOUT = float(os.getenv("LOG_STREAM_CONNECT_TIMEOUT", "10"))
+# 줄바꿈 없이 이어지는 출력은 이 길이에서 끊어서 전달
+LOG_LINE_MAX_CHARS = 64 * 1024
+
+TIMESTAMP_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(?:\.(\d+))?Z")
+
+
+def normalize_timestamp(value):
+    """Docker 타임스탬프를 나노초 9자리 고정 길이로 (문자열 비교 = 시간 비교, 형식이 아니면 None)
+
+    Docker는 RFC3339Nano 형식이라 소수점 끝의 0을 생략함 (예: ...:05.1Z)
+    """
+    match = TIMESTAMP_PATTERN.fullmatch(value or "")
+    if not match:
+        return None
+    fraction = (match.group(2) or "").ljust(9, "0")[:9]
+    return f"{match.group(1)}.{fraction}Z"
+
+
+def cursor_to_epoch(cursor):
+    """정규화된 타임스탬프 -> unix timestamp (docker logs since 용)"""
+    seconds = calendar.timegm(time.strptime(cursor[:19], "%Y-%m-%dT%H:%M:%S"))
+    return seconds + int(cursor[20:29]) / 1e9
+
+
+def split_log_line(line):
+    """'타임스탬프 메시지' -> {'timestamp', 'message'} (타임스탬프가 없으면 빈 문자열)"""
+    parts = line.split(" ", 1)
+    timestamp = normalize_timestamp(parts[0])
+    if timestamp is None:
+        return {"timestamp": "", "message": line}
+    return {"timestamp": timestamp, "message": parts[1] if len(parts) > 1 else ""}
+
+
+def parse_log_lines(output):
+    """timestamps=True 로 조회한 로그 전체를 줄 단위로 분리"""
+    return [split_log_line(line) for line in output.split("\n") if line.strip()]
+
+
+def format_event(entry, fmt):
+    """로그 한 줄 -> SSE 이벤트 (id가 재접속 커서) 또는 NDJSON 한 줄"""
+    if fmt == "ndjson":
+        return json.dumps(entry, ensure_ascii=False) + "\n"
+    event_id = f"id: {entry['timestamp']}\n" if entry["timestamp"] else ""
+    return f"{event_id}data: {json.dumps(entry, ensure_ascii=False)}\n\n"
+
+
+def format_control(event, data, fmt):
+    """lagged / end / heartbeat 같은 제어 이벤트"""
+    if fmt == "ndjson":
+        return json.dumps({"event": event, **data}, ensure_ascii=False) + "\n"
+    if event == "heartbeat":
+        return ": keep-alive\n\n"
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class LogSubscriber:
+    """뷰어 한 명의 버퍼 (follow 스레드가 채우고 이벤트 루프에서 꺼냄)"""
+
+    def __init__(self, container_id, loop, max_lines=LOG_STREAM_BUFFER_LINES):
+        self.container_id = container_id
+        self.loop = loop
+        self.max_lines = max_lines
+        self.lines = []
+        self.dropped = 0
+        self.ended = False
+        self.error = None
+        self.lock = threading.Lock()
+        self.ready = asyncio.Event()
+        self.connected = asyncio.Event()  # follow 스트림이 열렸거나 끝남 (이후의 줄은 모두 버퍼로 들어옴)
+
+    def _set(self, event):
+        try:
+            self.loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            # 이벤트 루프가 이미 닫힘 (서버 종료 중)
+            pass
+
+    def mark_connected(self):
+        """follow 스트림이 열린 뒤 호출 (follow 스레드 또는 구독 시점)"""
+        self._set(self.connected)
+
+    async def wait_connected(self, timeout=LOG_STREAM_CONNECT_TIMEOUT):
+        """follow 스트림이 열릴 때까지 대기 (지난 로그는 그 뒤에 조회해야 사이의 줄이 빠지지 않음), 열렸는지 반환"""
+        try:
+            await asyncio.wait_for(self.connected.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def push(self, entries=(), ended=False, error=None):
+        """follow 스레드에서 호출 (버퍼가 차면 오래된 줄을 버림)"""
+        with self.lock:
+            self.lines.extend(entries)
+            overflow = len(self.lines) - self.max_lines
+            if overflow > 0:
+                del self.lines[:overflow]
+                self.dropped += overflow
+            if ended:
+                self.ended = True
+                self.error = error
+        self._set(self.ready)
+        if ended:
+            self.mark_connected()
+
+    async def get(self, timeout=LOG_STREAM_HEARTBEAT):
+        """쌓인 줄을 한 번에 꺼냄 -> (줄 목록, 버린 줄 수, 종료 여부, 오류), timeout이면 None"""
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self.ready.clear()
+        with self.lock:
+            lines, self.lines = self.lines, []
+            dropped, self.dropped = self.dropped, 0
+            return lines, dropped, self.ended, self.error
+
+
+class LogFollower:
+    """컨테이너 하나의 docker logs --follow 스트림 (구독자가 없어지면 닫힘)"""
+
+    def __init__(self, hub, container_id):
+        self.hub = hub
+        self.container_id = container_id
+        self.subscribers = set()
+        self.stream = None
+        self.stopped = False
+        self.connected = False  # hub.lock 안에서만 변경
+
+    def start(self):
+        threading.Thread(
+            target=self._run, name=f"log-follow-{self.container_id[:12]}", daemon=True
+        ).start()
+
+    def stop(self):
+        """hub.lock을 잡은 상태에서 호출 (읽고 있던 스트림을 닫아 스레드 종료)"""
+        self.stopped = True
+        if self.stream is not None:
+            try:
+                self.stream.close()
+            except Exception:
+                pass
+
+    def broadcast(self, entries):
+        with self.hub.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            subscriber.push(entries)
+
+    def _run(self):
+        error = None
+        try:
+            # 지난 로그는 뷰어마다 스트림이 열린 뒤에 따로 조회하므로 새 줄만 (tail=0)
+            stream = self.hub.runtime_factory().stream_logs(
+                self.container_id, follow=True, timestamps=True, tail=0
+            )
+            with self.hub.lock:
+                if self.stopped:
+                    stream.close()
+                    return
+                self.stream = stream
+                self.connected = True
+                subscribers = list(self.subscribers)
+            for subscriber in subscribers:
+                subscriber.mark_connected()
+
+            partial = ""
+            for chunk in stream:
+                lines = (partial + chunk).split("\n")
+                partial = lines.pop()
+                if len(partial) > LOG_LINE_MAX_CHARS:
+                    lines.append(partial)
+                    partial = ""
+                entries = [split_log_line(line) for line in lines if line.strip()]
+                if entries:
+                    self.broadcast(entries)
+            if partial.strip():
+                self.broadcast([split_log_line(partial)])
+        except Exception as e:
+            if not self.stopped:
+                print(f"⚠️ Log follow error for {self.container_id[:12]}: {e}")
+                error = str(e)
+        finally:
+            self.hub._finished(self, error)
+
+
+class LogStreamHub:
+    """컨테이너 ID -> 공유 follow 스트림"""
+
+    def __init__(self, runtime_factory):
+        self.runtime_factory = runtime_factory
+        self.followers = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, container_id, loop):
+        """구독 시작 (이 컨테이너의 follow 스트림이 없으면 새로 염)"""
+        subscriber = LogSubscriber(container_id, loop)
+        with self.lock:
+            follower = self.followers.get(container_id)
+            created = follower is None
+            if created:
+                follower = LogFollower(self, container_id)
+                self.followers[container_id] = follower
+            follower.subscribers.add(subscriber)
+            if follower.connected:
+                subscriber.mark_connected()
+        if created:
+            follower.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """구독 종료 (마지막 뷰어가 나가면 follow 스트림도 닫음)"""
+        with self.lock:
+            follower = self.followers.get(subscriber.container_id)
+            if follower is None or subscriber not in follower.subscribers:
+                return
+            follower.subscribers.discard(subscriber)
+            if not follower.subscribers:
+                del self.followers[subscriber.container_id]
+                follower.stop()
+
+    def _finished(self, follower, error):
+        """follow 스트림 종료 (컨테이너 종료 등) -> 남은 뷰어에게 end 전달"""
+        with self.lock:
+            if self.followers.get(follower.container_id) is follower:
+                del self.followers[follower.container_id]
+            subscribers = list(follower.subscribers)
+            follower.subscribers.clear()
+        for subscriber in subscribers:
+            subscriber.push(ended=True, error=error)
+
+    def stats(self):
+        """컨테이너별 뷰어 수"""
+        with self.lock:
+            return {container_id: len(f.subscribers) for container_id, f in self.followers.items()}
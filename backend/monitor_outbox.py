@@ -0,0 +1,73 @@
+"""
+Container Monitor - 로컬 outbox (SQLite WAL)
+API로 전송할 실행 기록을 디스크에 먼저 저장해서 API 장애/재시작 시에도 유실되지 않도록 함
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+
+class Outbox:
+    """전송 대기 중인 실행 기록 저장소"""
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payload TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                is_dead INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL
+            )
+        """)
+
+    def append(self, record):
+        """기록 추가"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO outbox (payload, created_at) VALUES (?, ?)",
+                (json.dumps(record), time.time())
+            )
+
+    def peek(self, limit):
+        """오래된 순으로 전송 대상 조회 -> [(id, record)]"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, payload FROM outbox WHERE is_dead = 0 ORDER BY id LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [(row[0], json.loads(row[1])) for row in rows]
+
+    def ack(self, ids):
+        """전송 완료된 기록 삭제"""
+        with self.lock:
+            self.conn.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+
+    def mark_dead(self, ids):
+        """API가 거절한(4xx) 기록을 dead로 표시하고 보관 (전송 대상에서 제외, requeue_dead로 되살림)"""
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE outbox SET attempts = attempts + 1, is_dead = 1 WHERE id = ?",
+                [(i,) for i in ids]
+            )
+
+    def requeue_dead(self):
+        """dead로 보관된 기록을 다시 전송 대상으로 되돌림, 되돌린 수 반환"""
+        with self.lock:
+            return self.conn.execute("UPDATE outbox SET is_dead = 0 WHERE is_dead = 1").rowcount
+
+    def size(self):
+        """전송 대기 중인 기록 수"""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM outbox WHERE is_dead = 0").fetchone()[0]
+
+    def dead_count(self):
+        """dead로 보관된 기록 수"""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM outbox WHERE is_dead = 1").fetchone()[0]
@@ -0,0 +1,73 @@
+"""
+Container Monitor - 처리 완료된 컨테이너 상태 저장소 (SQLite)
+재시작 후에도 이미 처리한 컨테이너를 다시 처리하지 않도록 LRU + 디스크에 보관
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class ProcessedContainers:
+    """처리된 컨테이너 키(bounded) + 재개 지점(high-water mark) 저장소"""
+
+    def __init__(self, path, cache_size=5000, max_rows=50000):
+        self.cache = OrderedDict()  # 최근 처리한 키 LRU
+        self.cache_size = cache_size
+        self.max_rows = max_rows
+        self.inserts = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS processed (
+                container_key TEXT PRIMARY KEY,
+                processed_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_processed_at ON processed(processed_at)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _touch(self, key):
+        self.cache[key] = True
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def contains(self, key):
+        """처리 여부 확인 (LRU -> 디스크 순)"""
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return True
+            row = self.conn.execute("SELECT 1 FROM processed WHERE container_key = ?", (key,)).fetchone()
+            if row:
+                self._touch(key)
+            return row is not None
+
+    def add(self, key):
+        """처리 완료 기록 (오래된 기록은 max_rows를 넘으면 정리)"""
+        with self.lock:
+            self._touch(key)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO processed (container_key, processed_at) VALUES (?, ?)",
+                (key, time.time())
+            )
+            self.inserts += 1
+            if self.inserts % 1000 == 0:
+                self.conn.execute("""
+                    DELETE FROM processed WHERE container_key IN (
+                        SELECT container_key FROM processed ORDER BY processed_at DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_rows,))
+
+    def get_meta(self, key, default=None):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
@@ -0,0 +1,102 @@
+"""
+Job Management System - 참조 데이터 캐시
+거의 바뀌지 않는 조회 테이블(RunTypes, JobTypes, EnvironmentTypes, ErrorTypes)과
+사용자 이름의 이름 → ID 매핑을 프로세스 안에 캐시해서 쓰기 요청마다 반복되는 조회를 줄임
+"""
+
+import threading
+
+from sqlalchemy import text, bindparam
+
+# 테이블 -> (ID 컬럼, 이름 컬럼)
+LOOKUP_TABLES = {
+    "RunTypes": ("run_type_id", "name"),
+    "JobTypes": ("type_id", "name"),
+    "EnvironmentTypes": ("env_type_id", "name"),
+    "ErrorTypes": ("error_type_id", "name"),
+    "Users": ("user_id", "username"),
+}
+
+# 시작 시 전체를 읽어두는 테이블 (Users는 행이 많을 수 있어 아래 사용자만)
+WARM_TABLES = ("RunTypes", "JobTypes", "EnvironmentTypes", "ErrorTypes")
+WARM_USERS = ("system", "admin")
+
+
+class ReferenceCache:
+    """이름 -> ID 캐시 (없는 이름은 캐시하지 않음)
+
+    새로 만든 행은 트랜잭션이 커밋된 뒤에 put()으로 추가해야 롤백된 ID가 캐시에 남지 않음
+    """
+
+    def __init__(self):
+        self.ids = {table: {} for table in LOOKUP_TABLES}
+        self.hits = {table: 0 for table in LOOKUP_TABLES}
+        self.misses = {table: 0 for table in LOOKUP_TABLES}
+        self.lock = threading.Lock()
+
+    def warm(self, db):
+        """조회 테이블 전체와 기본 사용자를 미리 로드"""
+        for table in WARM_TABLES:
+            id_column, name_column = LOOKUP_TABLES[table]
+            rows = db.execute(text(f"SELECT {name_column}, {id_column} FROM {table}")).fetchall()
+            self.put_many(table, {row[0]: row[1] for row in rows})
+        self.get_many(db, "Users", WARM_USERS)
+
+    def get(self, db, table, name):
+        """이름으로 ID 조회 (캐시에 없으면 DB 조회, 없으면 None)"""
+        return self.get_many(db, table, [name]).get(name)
+
+    def get_many(self, db, table, names):
+        """여러 이름을 한 번에 조회 -> {이름: ID} (캐시에 없는 것만 IN 쿼리 1회)"""
+        found = {}
+        missing = []
+        with self.lock:
+            cached = self.ids[table]
+            for name in set(names):
+                if name in cached:
+                    found[name] = cached[name]
+                else:
+                    missing.append(name)
+            self.hits[table] += len(found)
+            self.misses[table] += len(missing)
+
+        if missing:
+            id_column, name_column = LOOKUP_TABLES[table]
+            rows = db.execute(
+                text(f"SELECT {name_column}, {id_column} FROM {table} WHERE {name_column} IN :names")
+                    .bindparams(bindparam("names", expanding=True)),
+                {"names": missing}
+            ).fetchall()
+            loaded = {row[0]: row[1] for row in rows}
+            self.put_many(table, loaded)
+            found.update(loaded)
+        return found
+
+    def put(self, table, name, row_id):
+        """커밋된 행 추가"""
+        self.put_many(table, {name: row_id})
+
+    def put_many(self, table, mapping):
+        with self.lock:
+            self.ids[table].update(mapping)
+
+    def invalidate(self, table=None, name=None):
+        """캐시 무효화 (table 없으면 전체, name 없으면 테이블 전체)"""
+        with self.lock:
+            for t in ([table] if table else LOOKUP_TABLES):
+                if name is None:
+                    self.ids[t].clear()
+                else:
+                    self.ids[t].pop(name, None)
+
+    def stats(self):
+        """테이블별 캐시 크기와 hit/miss 수"""
+        with self.lock:
+            return {
+                table: {"size": len(self.ids[table]), "hits": self.hits[table], "misses": self.misses[table]}
+                for table in LOOKUP_TABLES
+            }
+
+
+# 프로세스 공용 캐시
+reference_cache = ReferenceCache()
@@ -0,0 +1,144 @@
+"""
+Job Management System - API 응답 캐시
+자주 폴링되지만 잘 바뀌지 않는 목록 API 응답을 (경로 + 쿼리) 단위로 직렬화된 채로 캐시
+- 쓰기 API는 태그(jobs, schedules, users, audit_logs)로 무효화
+- ETag / Last-Modified를 붙여 바뀌지 않은 폴링은 DB 조회와 직렬화 없이 304 응답
+- 다른 프로세스(스케줄러 등)가 쓴 변경은 TTL이 지나면 반영
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import Response
+
+# 캐시 유효 시간 (초)
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+# 최대 캐시 항목 수 (쿼리 파라미터 조합마다 1개, 넘으면 오래 안 쓴 것부터 제거)
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+
+
+class CacheEntry:
+    def __init__(self, body, etag, last_modified, tags, headers, expires_at):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified  # unix timestamp (초 단위)
+        self.tags = tags
+        self.headers = headers  # X-Next-Cursor 등 응답에 함께 보낼 헤더
+        self.expires_at = expires_at
+
+    def response_headers(self):
+        return {
+            **self.headers,
+            "ETag": self.etag,
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+            "Cache-Control": "no-cache",
+        }
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match 헤더에 etag가 있는지 (W/ 약한 비교 허용)"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def not_modified_since(if_modified_since, last_modified):
+    try:
+        return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+class ResponseCache:
+    """(경로 + 쿼리) -> 직렬화된 응답"""
+
+    def __init__(self, ttl=RESPONSE_CACHE_TTL, max_entries=RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.generations = {}  # 태그 -> 무효화 횟수
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.lock = threading.Lock()
+
+    def respond(self, request, tags, load):
+        """캐시된 응답 반환 (없거나 만료되면 load(headers)로 새로 만듦)
+
+        load는 JSON으로 직렬화할 값을 반환하고, 함께 보낼 헤더가 있으면 headers dict에 넣음
+        """
+        key = f"{request.url.path}?{'&'.join(sorted(f'{k}={v}' for k, v in request.query_params.multi_items()))}"
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry.expires_at > now:
+                self.entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+                # 조회하는 동안 무효화되면 그 결과는 캐시하지 않음
+                generations = [self.generations.get(tag, 0) for tag in tags]
+                entry = None
+
+        if entry is None:
+            headers = {}
+            body = json.dumps(load(headers), ensure_ascii=False, default=str).encode("utf-8")
+            entry = self._store(key, tags, generations, body, headers)
+
+        if_none_match = request.headers.get("if-none-match")
+        if_modified_since = request.headers.get("if-modified-since")
+        if (if_none_match and etag_matches(if_none_match, entry.etag)) or \
+                (not if_none_match and if_modified_since and not_modified_since(if_modified_since, entry.last_modified)):
+            with self.lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=entry.response_headers())
+        return Response(content=entry.body, media_type="application/json", headers=entry.response_headers())
+
+    def _store(self, key, tags, generations, body, headers):
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        now = time.time()
+        with self.lock:
+            previous = self.entries.get(key)
+            # 내용이 같으면 Last-Modified도 유지 (If-Modified-Since 폴링이 계속 304를 받도록)
+            # 바뀌었으면 같은 초 안에 다시 만들어져도 이전 값보다 커지게 함 (초 단위라 같으면 잘못된 304)
+            if previous and previous.etag == etag:
+                last_modified = previous.last_modified
+            elif previous:
+                last_modified = max(int(now), previous.last_modified + 1)
+            else:
+                last_modified = int(now)
+            entry = CacheEntry(body, etag, last_modified, tuple(tags), headers, now + self.ttl)
+            if generations == [self.generations.get(tag, 0) for tag in tags]:
+                self.entries[key] = entry
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            return entry
+
+    def invalidate(self, *tags):
+        """태그가 붙은 응답 무효화 (Last-Modified 유지를 위해 항목은 만료 처리만)"""
+        with self.lock:
+            for tag in tags:
+                self.generations[tag] = self.generations.get(tag, 0) + 1
+            for entry in self.entries.values():
+                if any(tag in entry.tags for tag in tags):
+                    entry.expires_at = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+            }
+
+
+# 프로세스 공용 캐시
+response_cache = ResponseCache()
@@ -0,0 +1,270 @@
+"""
+Job Management System - 보관 기간 정리 (retention)
+오래된 JobRuns / 실행 로그 / AuditLogs를 작은 배치로 나눠 삭제하는 백그라운드 작업
+(배치마다 커밋하고 잠깐 쉬어서 긴 락을 잡지 않음, 설정하면 삭제 전에 gzip JSONL로 보관)
+"""
+
+import base64
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytz
+from sqlalchemy import text, bindparam
+
+KST = pytz.timezone('Asia/Seoul')
+
+# 테이블별 보관 기간 (일, 0이면 삭제하지 않음)
+RETENTION_DAYS = {
+    # 실행 로그 (JobRunLogChunks + 기존 JobRunLogs), 실행 시작 시각 기준
+    "JobRunLogs": int(os.getenv("RETENTION_LOG_DAYS", "30")),
+    "AuditLogs": int(os.getenv("RETENTION_AUDIT_DAYS", "180")),
+    # 실행 이력 (오류 / 로그 포함, RUNNING은 제외)
+    "JobRuns": int(os.getenv("RETENTION_RUN_DAYS", "90")),
+}
+# 정리 주기 (초)
+RETENTION_INTERVAL_SECONDS = float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+# 한 번에 삭제하는 행 수 (로그는 실행 수 기준, 청크가 커서 더 작게)
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "1000"))
+RETENTION_LOG_BATCH_SIZE = int(os.getenv("RETENTION_LOG_BATCH_SIZE", "50"))
+# 배치 사이 대기 시간 (초), 다른 쓰기 작업이 락을 얻을 틈을 줌
+RETENTION_PAUSE_SECONDS = float(os.getenv("RETENTION_PAUSE_SECONDS", "0.2"))
+# 삭제 전 보관 디렉터리 (비어 있으면 보관하지 않고 삭제)
+RETENTION_ARCHIVE_DIR = os.getenv("RETENTION_ARCHIVE_DIR", "")
+
+# 정리 순서 (로그 -> Audit -> 실행 이력)
+RETENTION_ORDER = ("JobRunLogs", "AuditLogs", "JobRuns")
+
+
+def expanding(query):
+    return text(query).bindparams(bindparam("ids", expanding=True))
+
+
+def json_value(value):
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode("ascii")
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class RetentionPurger:
+    """보관 기간이 지난 행 정리 워커와 진행 상황"""
+
+    def __init__(self, session_factory, retention_days=None, interval=RETENTION_INTERVAL_SECONDS,
+                 archive_dir=RETENTION_ARCHIVE_DIR, on_change=None):
+        self.session_factory = session_factory
+        self.retention_days = dict(retention_days or RETENTION_DAYS)
+        self.interval = interval
+        self.archive_dir = archive_dir
+        self.on_change = on_change  # (테이블, 삭제한 행 수) -> 배치를 지울 때마다 호출
+        self.wakeup = threading.Event()
+        self.lock = threading.Lock()
+        self.started = False
+        # 로그를 정리한 마지막 실행 (started_at, run_id), 다음 정리는 여기서부터 이어서 훑음
+        self.log_cursor = (datetime(1970, 1, 1), "")
+        self.progress = {
+            "state": "idle",
+            "current_table": None,
+            "pass_started_at": None,
+            "pass_finished_at": None,
+            "last_error": None,
+            "tables": {
+                table: {"retention_days": days, "cutoff": None, "deleted": 0, "archived": 0, "total_deleted": 0}
+                for table, days in self.retention_days.items()
+            },
+        }
+
+    def start(self):
+        if self.started:
+            return
+        self.started = True
+        threading.Thread(target=self._loop, name="retention-purger", daemon=True).start()
+
+    def trigger(self):
+        """다음 주기를 기다리지 않고 바로 정리"""
+        self.wakeup.set()
+
+    def status(self):
+        with self.lock:
+            return json.loads(json.dumps(self.progress))
+
+    def _loop(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"❌ Retention purge error: {e}")
+                self._update(last_error=str(e))
+            finally:
+                self._update(state="idle", current_table=None)
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+
+    def _update(self, table=None, **fields):
+        with self.lock:
+            target = self.progress["tables"][table] if table else self.progress
+            for key, value in fields.items():
+                target[key] = value
+
+    def _count(self, table, deleted, archived):
+        with self.lock:
+            stats = self.progress["tables"][table]
+            stats["deleted"] += deleted
+            stats["archived"] += archived
+            stats["total_deleted"] += deleted
+        if deleted and self.on_change:
+            try:
+                self.on_change(table, deleted)
+            except Exception as e:
+                print(f"⚠️ Retention change listener error: {e}")
+
+    def run_once(self):
+        """테이블마다 보관 기간이 지난 행을 배치 단위로 정리"""
+        self._update(state="running", pass_started_at=datetime.now(KST).isoformat(), last_error=None)
+        for table in RETENTION_ORDER:
+            days = self.retention_days.get(table, 0)
+            if days <= 0:
+                continue
+            # JobRuns.started_at은 KST, AuditLogs.created_at은 UTC로 저장됨
+            if table == "AuditLogs":
+                cutoff = datetime.utcnow() - timedelta(days=days)
+            else:
+                cutoff = datetime.now(KST).replace(tzinfo=None) - timedelta(days=days)
+            self._update(table, cutoff=cutoff.isoformat(), deleted=0, archived=0)
+            self._update(current_table=table)
+            {
+                "JobRunLogs": self.purge_run_logs,
+                "AuditLogs": self.purge_audit_logs,
+                "JobRuns": self.purge_runs,
+            }[table](cutoff)
+        self._update(pass_finished_at=datetime.now(KST).isoformat())
+
+    def _batches(self, table, purge_batch, on_commit=None):
+        """purge_batch(db) -> (삭제 행 수, 보관 행 수) 또는 더 없으면 None, 배치마다 커밋 후 on_commit() 호출"""
+        while True:
+            db = self.session_factory()
+            try:
+                result = purge_batch(db)
+                if result is None:
+                    db.rollback()
+                    return
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            if on_commit:
+                on_commit()
+            self._count(table, *result)
+            time.sleep(RETENTION_PAUSE_SECONDS)
+
+    def purge_audit_logs(self, cutoff):
+        def purge_batch(db):
+            rows = db.execute(
+                text("""
+                    SELECT * FROM AuditLogs WHERE created_at < :cutoff
+                    ORDER BY created_at, audit_id LIMIT :limit
+                """),
+                {"cutoff": cutoff, "limit": RETENTION_BATCH_SIZE}
+            ).fetchall()
+            if not rows:
+                return None
+            archived = self.archive("AuditLogs", rows)
+            ids = {"ids": [row._mapping["audit_id"] for row in rows]}
+            deleted = db.execute(expanding("DELETE FROM AuditLogs WHERE audit_id IN :ids"), ids).rowcount
+            return deleted, archived
+
+        self._batches("AuditLogs", purge_batch)
+
+    def purge_run_logs(self, cutoff):
+        """오래된 실행의 로그만 삭제 (실행 이력은 JobRuns 보관 기간까지 유지)
+
+        로그를 지운 실행도 남아 있으므로 (started_at, run_id) 커서로 한 번씩만 훑고,
+        커서는 정리 주기 사이에도 유지해서 다음 정리는 지난번 이후 기준 시각을 넘은 실행만 봄
+        (프로세스를 재시작하면 처음부터 한 번 다시 훑음)
+        """
+        pending = {}
+
+        def purge_batch(db):
+            after_time, after_id = self.log_cursor
+            runs = db.execute(
+                text("""
+                    SELECT run_id, started_at FROM JobRuns
+                    WHERE started_at < :cutoff
+                      AND (started_at > :after_time OR (started_at = :after_time AND run_id > :after_id))
+                    ORDER BY started_at, run_id LIMIT :limit
+                """),
+                {"cutoff": cutoff, "limit": RETENTION_LOG_BATCH_SIZE, "after_time": after_time, "after_id": after_id}
+            ).fetchall()
+            if not runs:
+                return None
+            pending["cursor"] = (runs[-1][1], runs[-1][0])
+            ids = {"ids": [row[0] for row in runs]}
+            archived = 0
+            if self.archive_dir:
+                archived += self.archive("JobRunLogChunks", db.execute(
+                    expanding("SELECT * FROM JobRunLogChunks WHERE run_id IN :ids ORDER BY run_id, seq"), ids).fetchall())
+                archived += self.archive("JobRunLogs", db.execute(
+                    expanding("SELECT * FROM JobRunLogs WHERE run_id IN :ids ORDER BY run_id, seq"), ids).fetchall())
+            deleted = db.execute(expanding("DELETE FROM JobRunLogChunks WHERE run_id IN :ids"), ids).rowcount
+            deleted += db.execute(expanding("DELETE FROM JobRunLogs WHERE run_id IN :ids"), ids).rowcount
+            return deleted, archived
+
+        def advance_cursor():
+            # 커밋이 끝난 배치까지만 전진 (실패한 배치는 다음 정리에서 다시 시도)
+            self.log_cursor = pending["cursor"]
+
+        self._batches("JobRunLogs", purge_batch, on_commit=advance_cursor)
+
+    def purge_runs(self, cutoff):
+        """오래된 실행과 딸린 오류 / 로그 삭제 (아직 RUNNING인 실행은 남김)"""
+        def purge_batch(db):
+            runs = db.execute(
+                text("""
+                    SELECT * FROM JobRuns WHERE started_at < :cutoff AND status <> 'RUNNING'
+                    ORDER BY started_at, run_id LIMIT :limit
+                """),
+                {"cutoff": cutoff, "limit": RETENTION_BATCH_SIZE}
+            ).fetchall()
+            if not runs:
+                return None
+            ids = {"ids": [row._mapping["run_id"] for row in runs]}
+            archived = self.archive("JobRuns", runs)
+            if self.archive_dir:
+                archived += self.archive("JobRunErrors", db.execute(
+                    expanding("SELECT * FROM JobRunErrors WHERE run_id IN :ids"), ids).fetchall())
+            for query in (
+                "DELETE FROM JobRunErrors WHERE run_id IN :ids",
+                "DELETE FROM JobRunLogChunks WHERE run_id IN :ids",
+                "DELETE FROM JobRunLogs WHERE run_id IN :ids",
+            ):
+                db.execute(expanding(query), ids)
+            deleted = db.execute(expanding("DELETE FROM JobRuns WHERE run_id IN :ids"), ids).rowcount
+            return deleted, archived
+
+        self._batches("JobRuns", purge_batch)
+
+    def archive(self, table, rows):
+        """삭제 전에 rows를 {archive_dir}/{table}/{table}-{날짜}.jsonl.gz 에 추가 (보관하지 않으면 0)
+
+        파일을 디스크에 기록한 뒤에 삭제를 커밋하므로 보관에 실패하면 삭제도 하지 않음
+        """
+        if not self.archive_dir or not rows:
+            return 0
+        directory = os.path.join(self.archive_dir, table)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{table}-{datetime.now(KST):%Y%m%d}.jsonl.gz")
+        # gzip 멤버를 이어 붙이는 방식이라 하루 파일에 배치마다 추가해도 하나의 gzip으로 읽힘
+        with open(path, "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="ab") as archive:
+                for row in rows:
+                    record = {key: json_value(value) for key, value in row._mapping.items()}
+                    archive.write((json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+            raw.flush()
+            os.fsync(raw.fileno())
+        return len(rows)
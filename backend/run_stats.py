@@ -0,0 +1,217 @@
+"""
+Job Management System - 실행 통계 롤업
+완료된 실행을 (Job, 시작 시각(KST) 시간 단위)로 누적해서 JobRunStats / JobRunStatsSketch / JobRunErrorStats에 저장
+- 실행이 완료(또는 다시 완료 처리)될 때 같은 트랜잭션에서 해당 실행만 더하고 빼므로 JobRuns 전체를 다시 읽지 않음
+- 소요 시간은 로그 스케일 버킷 수(sketch)로 저장해서 임의 기간의 버킷을 더한 뒤 p50 / p95 계산 (상대 오차 약 2.5%)
+"""
+
+from sqlalchemy import text, bindparam
+
+# 통계에 포함하는 (완료된) 실행 상태
+FINISHED_STATUSES = ("SUCCESS", "FAILED", "CANCELLED")
+# sketch 버킷 비율: 버킷 i(2 이상)는 [GAMMA^(i-2), GAMMA^(i-1)) 초, 0은 0초 (바꾸면 기존 통계를 rebuild 해야 함)
+SKETCH_GAMMA = 1.05
+
+# 시작 시각 -> 시간 버킷 (JobRuns.started_at과 같은 KST 기준)
+HOUR_BUCKET = "DATE_FORMAT(jr.started_at, '%Y-%m-%d %H:00:00')"
+# 소요 시간(초), 시계 차이로 음수면 0
+DURATION = "GREATEST(TIMESTAMPDIFF(SECOND, jr.started_at, jr.finished_at), 0)"
+SKETCH_INDEX = f"CASE WHEN {DURATION} = 0 THEN 0 ELSE 2 + FLOOR(LN({DURATION}) / LN({SKETCH_GAMMA})) END"
+# 소요 시간 통계에는 정상 종료 / 실패한 실행만 포함 (취소된 실행은 건수만)
+HAS_DURATION = "jr.status IN ('SUCCESS', 'FAILED') AND jr.finished_at IS NOT NULL"
+
+# /api/stats 집계 단위 -> 버킷 표현식
+INTERVALS = {
+    "hour": "DATE_FORMAT(s.bucket_start, '%Y-%m-%d %H:00:00')",
+    "day": "DATE_FORMAT(s.bucket_start, '%Y-%m-%d 00:00:00')",
+    "total": "NULL",
+}
+
+ROLLUP_QUERIES = (
+    f"""
+        INSERT INTO JobRunStats (job_id, bucket_start, run_count, success_count, failed_count, cancelled_count,
+                                 duration_count, duration_sum)
+        SELECT * FROM (
+            SELECT jr.job_id, {HOUR_BUCKET} AS bucket_start,
+                   :sign * COUNT(*) AS run_count,
+                   :sign * SUM(jr.status = 'SUCCESS') AS success_count,
+                   :sign * SUM(jr.status = 'FAILED') AS failed_count,
+                   :sign * SUM(jr.status = 'CANCELLED') AS cancelled_count,
+                   :sign * SUM({HAS_DURATION}) AS duration_count,
+                   :sign * COALESCE(SUM(CASE WHEN {HAS_DURATION} THEN {DURATION} END), 0) AS duration_sum
+            FROM JobRuns jr
+            WHERE jr.status IN :statuses {{condition}}
+            GROUP BY jr.job_id, bucket_start
+        ) AS delta
+        ON DUPLICATE KEY UPDATE
+            run_count = JobRunStats.run_count + delta.run_count,
+            success_count = JobRunStats.success_count + delta.success_count,
+            failed_count = JobRunStats.failed_count + delta.failed_count,
+            cancelled_count = JobRunStats.cancelled_count + delta.cancelled_count,
+            duration_count = JobRunStats.duration_count + delta.duration_count,
+            duration_sum = JobRunStats.duration_sum + delta.duration_sum
+    """,
+    f"""
+        INSERT INTO JobRunStatsSketch (job_id, bucket_start, sketch_index, run_count)
+        SELECT * FROM (
+            SELECT jr.job_id, {HOUR_BUCKET} AS bucket_start, {SKETCH_INDEX} AS sketch_index,
+                   :sign * COUNT(*) AS run_count
+            FROM JobRuns jr
+            WHERE jr.status IN :statuses AND {HAS_DURATION} {{condition}}
+            GROUP BY jr.job_id, bucket_start, sketch_index
+        ) AS delta
+        ON DUPLICATE KEY UPDATE run_count = JobRunStatsSketch.run_count + delta.run_count
+    """,
+    f"""
+        INSERT INTO JobRunErrorStats (job_id, bucket_start, error_type_id, error_count)
+        SELECT * FROM (
+            SELECT jr.job_id, {HOUR_BUCKET} AS bucket_start, e.error_type_id, :sign * COUNT(*) AS error_count
+            FROM JobRunErrors e
+            JOIN JobRuns jr ON jr.run_id = e.run_id
+            WHERE jr.status IN :statuses AND e.error_type_id IS NOT NULL {{condition}}
+            GROUP BY jr.job_id, bucket_start, e.error_type_id
+        ) AS delta
+        ON DUPLICATE KEY UPDATE error_count = JobRunErrorStats.error_count + delta.error_count
+    """,
+)
+
+
+def _apply(db, sign, condition="", params=None):
+    """조건에 맞는 완료된 실행을 통계에 더함 (sign=-1이면 뺌)"""
+    for query in ROLLUP_QUERIES:
+        statement = text(query.format(condition=condition)).bindparams(bindparam("statuses", expanding=True))
+        if "run_ids" in (params or {}):
+            statement = statement.bindparams(bindparam("run_ids", expanding=True))
+        db.execute(statement, {"sign": sign, "statuses": list(FINISHED_STATUSES), **(params or {})})
+
+
+def record_runs(db, run_ids):
+    """실행 완료 / 오류 기록 후 호출 (커밋은 호출한 쪽에서)"""
+    run_ids = [run_id for run_id in run_ids if run_id]
+    if run_ids:
+        _apply(db, 1, "AND jr.run_id IN :run_ids", {"run_ids": run_ids})
+
+
+def retract_runs(db, run_ids):
+    """이미 완료된 실행을 다시 고치기 전에 호출 (이전 값을 통계에서 뺌, 완료 전 실행은 영향 없음)"""
+    run_ids = [run_id for run_id in run_ids if run_id]
+    if run_ids:
+        _apply(db, -1, "AND jr.run_id IN :run_ids", {"run_ids": run_ids})
+
+
+def rebuild(db):
+    """남아 있는 JobRuns 전체로 통계를 다시 계산 (커밋은 호출한 쪽에서)"""
+    for table in ("JobRunStatsSketch", "JobRunErrorStats", "JobRunStats"):
+        db.execute(text(f"DELETE FROM {table}"))
+    _apply(db, 1)
+
+
+def is_empty(db):
+    """통계가 비어 있는데 완료된 실행은 있는지 (처음 배포 시 rebuild 필요 여부)"""
+    if db.execute(text("SELECT 1 FROM JobRunStats LIMIT 1")).fetchone():
+        return False
+    return db.execute(
+        text("SELECT 1 FROM JobRuns WHERE status IN :statuses LIMIT 1").bindparams(bindparam("statuses", expanding=True)),
+        {"statuses": list(FINISHED_STATUSES)}
+    ).fetchone() is not None
+
+
+def sketch_value(index):
+    """sketch 버킷 대표값 (초), 버킷 범위 안에서 상대 오차가 가장 작은 값"""
+    if index <= 0:
+        return 0.0
+    return 2 * SKETCH_GAMMA ** (index - 1) / (SKETCH_GAMMA + 1)
+
+
+def sketch_quantile(buckets, q):
+    """{sketch_index: 실행 수} -> q 분위수 (초), 비어 있으면 None"""
+    total = sum(count for count in buckets.values() if count > 0)
+    if total <= 0:
+        return None
+    rank = q * (total - 1)
+    seen = 0
+    for index in sorted(buckets):
+        if buckets[index] <= 0:
+            continue
+        seen += buckets[index]
+        if seen > rank:
+            return round(sketch_value(index), 3)
+    return round(sketch_value(max(buckets)), 3)
+
+
+def load_stats(db, job_ids=None, start=None, end=None, interval="day"):
+    """start ~ end 기간 통계를 Job / interval 단위로 합산
+
+    -> {"series": [...], "error_types": [...]} (start / end는 KST naive, 시간 버킷 단위로 비교)
+    """
+    bucket = INTERVALS[interval]
+    conditions, params = [], {}
+    if job_ids:
+        conditions.append("s.job_id IN :job_ids")
+        params["job_ids"] = list(job_ids)
+    if start:
+        conditions.append("s.bucket_start >= :start")
+        params["start"] = start.replace(minute=0, second=0, microsecond=0)
+    if end:
+        conditions.append("s.bucket_start <= :end")
+        params["end"] = end
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    def query(sql):
+        statement = text(sql)
+        if job_ids:
+            statement = statement.bindparams(bindparam("job_ids", expanding=True))
+        return db.execute(statement, params).fetchall()
+
+    rows = query(f"""
+        SELECT s.job_id, j.name, {bucket} AS bucket,
+               SUM(s.run_count), SUM(s.success_count), SUM(s.failed_count), SUM(s.cancelled_count),
+               SUM(s.duration_count), SUM(s.duration_sum)
+        FROM JobRunStats s
+        JOIN Jobs j ON j.job_id = s.job_id
+        {where}
+        GROUP BY s.job_id, j.name, bucket
+        HAVING SUM(s.run_count) > 0
+        ORDER BY bucket, j.name
+    """)
+    sketches = {}
+    for job_id, bucket_start, index, count in query(f"""
+        SELECT s.job_id, {bucket} AS bucket, s.sketch_index, SUM(s.run_count)
+        FROM JobRunStatsSketch s
+        {where}
+        GROUP BY s.job_id, bucket, s.sketch_index
+    """):
+        sketches.setdefault((job_id, bucket_start), {})[index] = int(count)
+    errors = query(f"""
+        SELECT s.job_id, et.name, SUM(s.error_count)
+        FROM JobRunErrorStats s
+        JOIN ErrorTypes et ON et.error_type_id = s.error_type_id
+        {where}
+        GROUP BY s.job_id, et.name
+        HAVING SUM(s.error_count) > 0
+        ORDER BY SUM(s.error_count) DESC
+    """)
+
+    series = []
+    for job_id, job_name, bucket_start, runs, success, failed, cancelled, duration_count, duration_sum in rows:
+        runs, success, failed, cancelled = int(runs), int(success), int(failed), int(cancelled)
+        buckets = sketches.get((job_id, bucket_start), {})
+        series.append({
+            "job_id": job_id,
+            "job_name": job_name,
+            "bucket_start": bucket_start,
+            "runs": runs,
+            "success": success,
+            "failed": failed,
+            "cancelled": cancelled,
+            "success_rate": round(success / (success + failed), 4) if success + failed else None,
+            "avg_duration": round(int(duration_sum) / int(duration_count), 3) if duration_count else None,
+            "p50_duration": sketch_quantile(buckets, 0.5),
+            "p95_duration": sketch_quantile(buckets, 0.95),
+        })
+    return {
+        "series": series,
+        "error_types": [
+            {"job_id": job_id, "error_type": name, "count": int(count)} for job_id, name, count in errors
+        ],
+    }
@@ -9,7 +9,8 @@ CREATE TABLE Users (
     email VARCHAR(100) NOT NULL UNIQUE,
     role VARCHAR(20) NOT NULL CHECK (role IN ('admin', 'developer', 'viewer')),
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_users_username (username)
 );
 
 -- Job 유형 테이블
@@ -35,7 +36,9 @@ CREATE TABLE EnvironmentTypes (
 CREATE TABLE ErrorTypes (
     error_type_id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
     name VARCHAR(50) NOT NULL UNIQUE,
-    description TEXT
+    description TEXT,
+    priority INT,  -- 로그 분류 우선순위 (낮을수록 우선, NULL이면 기본값)
+    match_patterns JSON  -- 모니터 오류 분류기에 추가할 로그 패턴 목록 (예: ["quota exceeded"])
 );
 
 -- 에이전트 테이블
@@ -46,6 +49,7 @@ CREATE TABLE Agents (
     env_type_id CHAR(36),
     is_active BOOLEAN DEFAULT TRUE,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_agents_name (name),
     FOREIGN KEY (env_type_id) REFERENCES EnvironmentTypes(env_type_id)
 );
 
@@ -61,6 +65,7 @@ CREATE TABLE Jobs (
     is_active BOOLEAN DEFAULT TRUE,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_jobs_name (name),
     FOREIGN KEY (type_id) REFERENCES JobTypes(type_id),
     FOREIGN KEY (owner_id) REFERENCES Users(user_id) ON DELETE SET NULL
 );
@@ -71,7 +76,9 @@ CREATE TABLE JobSchedules (
     job_id CHAR(36) NOT NULL,
     cron_expression VARCHAR(100) NOT NULL,
     is_active BOOLEAN DEFAULT TRUE,
+    next_run_at DATETIME,  -- 다음 실행 시간 (KST), 스케줄러가 claim 후 갱신
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME(6) DEFAULT CURRENT_TIMESTAMP(6),  -- API에서 생성/활성화/비활성화한 시각 (스케줄러가 변경 감지에 사용)
     FOREIGN KEY (job_id) REFERENCES Jobs(job_id) ON DELETE CASCADE
 );
 
@@ -86,6 +93,8 @@ CREATE TABLE JobRuns (
     exit_code INT,
     started_at DATETIME NOT NULL,
     finished_at DATETIME,
+    container_id VARCHAR(64),  -- 모니터가 감지한 컨테이너 ID (중복 등록 방지)
+    UNIQUE KEY uq_jobruns_container (container_id),
     FOREIGN KEY (job_id) REFERENCES Jobs(job_id),
     FOREIGN KEY (agent_id) REFERENCES Agents(agent_id) ON DELETE SET NULL,
     FOREIGN KEY (run_type_id) REFERENCES RunTypes(run_type_id),
@@ -96,11 +105,27 @@ CREATE TABLE JobRuns (
 CREATE TABLE JobRunLogs (
     log_id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
     run_id CHAR(36) NOT NULL,
+    seq INT NOT NULL DEFAULT 0,  -- 청크 순번 (스트리밍 저장 시 0부터 증가)
     log_text LONGTEXT,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (run_id) REFERENCES JobRuns(run_id) ON DELETE CASCADE
 );
 
+-- Job 실행 로그 청크 (압축 전 기준 고정 크기 zlib 청크, 오프셋은 로그 전체 기준)
+CREATE TABLE JobRunLogChunks (
+    run_id CHAR(36) NOT NULL,
+    seq INT NOT NULL,
+    byte_offset BIGINT NOT NULL,  -- 이 청크 첫 바이트의 위치
+    line_offset BIGINT NOT NULL,  -- 이 청크 앞까지의 줄바꿈 수
+    byte_count INT NOT NULL,  -- 압축 전 크기
+    line_count INT NOT NULL,  -- 청크 안의 줄바꿈 수
+    codec VARCHAR(10) NOT NULL DEFAULT 'zlib',
+    data MEDIUMBLOB NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (run_id, seq),
+    FOREIGN KEY (run_id) REFERENCES JobRuns(run_id) ON DELETE CASCADE
+);
+
 -- Job 실행 오류 테이블
 CREATE TABLE JobRunErrors (
     error_id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
@@ -122,23 +147,95 @@ CREATE TABLE AuditLogs (
     target_id CHAR(36),
     before_value JSON,
     after_value JSON,
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    -- after_value에서 추출한 조회/필터용 컬럼 (INSERT 시 한 번 계산되어 저장, 값이 없거나 형식이 다르면 NULL)
+    status VARCHAR(20) GENERATED ALWAYS AS
+        (JSON_VALUE(after_value, '$.status' RETURNING CHAR(20) NULL ON EMPTY NULL ON ERROR)) STORED,
+    error_type VARCHAR(50) GENERATED ALWAYS AS
+        (JSON_VALUE(after_value, '$.error_type' RETURNING CHAR(50) NULL ON EMPTY NULL ON ERROR)) STORED,
+    exit_code INT GENERATED ALWAYS AS
+        (JSON_VALUE(after_value, '$.exit_code' RETURNING SIGNED NULL ON EMPTY NULL ON ERROR)) STORED,
+    container_name VARCHAR(255) GENERATED ALWAYS AS
+        (JSON_VALUE(after_value, '$.container_name' RETURNING CHAR(255) NULL ON EMPTY NULL ON ERROR)) STORED,
     FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE SET NULL
 );
 
+-- 실행 통계 롤업 (Job / 시작 시각(KST) 시간 단위, 완료된 실행만 누적, 일 단위는 조회 시 합산)
+-- JobRuns 보관 기간이 지나 원본이 정리되어도 통계는 유지
+CREATE TABLE JobRunStats (
+    job_id CHAR(36) NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    run_count INT NOT NULL DEFAULT 0,
+    success_count INT NOT NULL DEFAULT 0,
+    failed_count INT NOT NULL DEFAULT 0,
+    cancelled_count INT NOT NULL DEFAULT 0,
+    duration_count INT NOT NULL DEFAULT 0,  -- 소요 시간이 있는 SUCCESS / FAILED 실행 수
+    duration_sum BIGINT NOT NULL DEFAULT 0,  -- 초
+    PRIMARY KEY (job_id, bucket_start),
+    FOREIGN KEY (job_id) REFERENCES Jobs(job_id) ON DELETE CASCADE
+);
+
+-- 소요 시간 분포 (로그 스케일 버킷별 실행 수, 버킷끼리 더하면 임의 구간의 p50 / p95 계산 가능)
+CREATE TABLE JobRunStatsSketch (
+    job_id CHAR(36) NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    sketch_index SMALLINT NOT NULL,
+    run_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (job_id, bucket_start, sketch_index),
+    FOREIGN KEY (job_id) REFERENCES Jobs(job_id) ON DELETE CASCADE
+);
+
+-- 오류 유형별 발생 수 (완료된 실행의 JobRunErrors 기준)
+CREATE TABLE JobRunErrorStats (
+    job_id CHAR(36) NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    error_type_id CHAR(36) NOT NULL,
+    error_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (job_id, bucket_start, error_type_id),
+    FOREIGN KEY (job_id) REFERENCES Jobs(job_id) ON DELETE CASCADE,
+    FOREIGN KEY (error_type_id) REFERENCES ErrorTypes(error_type_id)
+);
+
 -- 인덱스 생성
 CREATE INDEX idx_jobs_owner ON Jobs(owner_id);
 CREATE INDEX idx_jobs_type ON Jobs(type_id);
 CREATE INDEX idx_jobs_active ON Jobs(is_active);
 
-CREATE INDEX idx_jobruns_job_started ON JobRuns(job_id, started_at DESC);
-CREATE INDEX idx_jobruns_status ON JobRuns(status);
+-- /api/runs keyset 페이지네이션: (started_at, run_id) 정렬 + 필터별 인덱스
+CREATE INDEX idx_jobruns_started ON JobRuns(started_at DESC, run_id DESC);
+CREATE INDEX idx_jobruns_job_started ON JobRuns(job_id, started_at DESC, run_id DESC);
+CREATE INDEX idx_jobruns_status ON JobRuns(status, started_at DESC, run_id DESC);
+CREATE INDEX idx_jobruns_type_started ON JobRuns(run_type_id, started_at DESC, run_id DESC);
 CREATE INDEX idx_jobruns_agent ON JobRuns(agent_id);
+-- 변경 피드: 최근 종료된 실행 조회
+CREATE INDEX idx_jobruns_finished ON JobRuns(finished_at);
+
+CREATE INDEX idx_jobrunlogs_run_seq ON JobRunLogs(run_id, seq);
+-- 로그 범위 조회 (바이트 / 줄 오프셋으로 시작 청크 찾기)
+CREATE INDEX idx_logchunks_run_byte ON JobRunLogChunks(run_id, byte_offset);
+CREATE INDEX idx_logchunks_run_line ON JobRunLogChunks(run_id, line_offset);
+
+CREATE INDEX idx_jobschedules_due ON JobSchedules(is_active, next_run_at);
+CREATE INDEX idx_jobschedules_updated ON JobSchedules(updated_at);
 
 CREATE INDEX idx_agents_active ON Agents(is_active);
+CREATE INDEX idx_agents_hostname ON Agents(hostname);
 
 CREATE INDEX idx_auditlogs_user_time ON AuditLogs(user_id, created_at DESC);
-CREATE INDEX idx_auditlogs_target ON AuditLogs(target_type, target_id);
+-- /api/audit-logs keyset 페이지네이션: (created_at, audit_id) 정렬 + action_type 필터
+CREATE INDEX idx_auditlogs_time ON AuditLogs(created_at DESC, audit_id DESC);
+CREATE INDEX idx_auditlogs_action_time ON AuditLogs(action_type, created_at DESC, audit_id DESC);
+CREATE INDEX idx_auditlogs_target ON AuditLogs(target_type, target_id, created_at DESC, audit_id DESC);
+-- /api/audit-logs status / error_type / exit_code / container_name 필터 (생성 컬럼)
+CREATE INDEX idx_auditlogs_status_time ON AuditLogs(status, error_type, created_at DESC, audit_id DESC);
+CREATE INDEX idx_auditlogs_error_time ON AuditLogs(error_type, created_at DESC, audit_id DESC);
+CREATE INDEX idx_auditlogs_exit_time ON AuditLogs(exit_code, created_at DESC, audit_id DESC);
+CREATE INDEX idx_auditlogs_container_time ON AuditLogs(container_name, created_at DESC, audit_id DESC);
+
+-- /api/stats 전체 Job 기간 조회
+CREATE INDEX idx_runstats_bucket ON JobRunStats(bucket_start);
+CREATE INDEX idx_runstats_sketch_bucket ON JobRunStatsSketch(bucket_start);
+CREATE INDEX idx_runstats_error_bucket ON JobRunErrorStats(bucket_start);
 
 -- 기본 데이터 삽입
 INSERT INTO JobTypes (name, description) VALUES 
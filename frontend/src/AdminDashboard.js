@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import './AdminDashboard.css';
+import useEventFeed, { upsertItem, removeItem } from './useEventFeed';
 
 const API_BASE = 'http://localhost:8000';
 
@@ -12,10 +13,18 @@ function AdminDashboard() {
 
   useEffect(() => {
     fetchData();
-    const interval = setInterval(fetchData, 5000); // 5초마다 새로고침
-    return () => clearInterval(interval);
   }, []);
 
+  // 폴링 대신 서버에서 바뀐 항목만 받아서 반영
+  useEventFeed(API_BASE, {
+    run: (run) => setRuns(prev => upsertItem(prev, run, 'run_id', 50)),
+    'run.deleted': ({ run_id }) => setRuns(prev => removeItem(prev, 'run_id', run_id)),
+    audit: (log) => setAuditLogs(prev => upsertItem(prev, log, 'audit_id', 50)),
+    job: (job) => setJobs(prev => upsertItem(prev, { ...job, owner_username: job.username || 'Unknown' }, 'job_id')),
+    'job.deleted': ({ job_id }) => setJobs(prev => removeItem(prev, 'job_id', job_id)),
+    reset: () => fetchData()
+  });
+
   const fetchData = async () => {
     try {
       const [jobsRes, runsRes, auditRes] = await Promise.all([
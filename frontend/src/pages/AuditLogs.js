@@ -14,7 +14,7 @@ function AuditLogs() {
     if (log.error_type) return log.error_type;
     
     // 기존 데이터에 대한 fallback 로직
-    const exitCode = log.details?.exit_code;
+    const exitCode = log.exit_code ?? log.details?.exit_code;
     if (exitCode === 255 || exitCode > 128) return 'RESOURCE_ERROR';
     if (exitCode === 127) return 'SCRIPT_ERROR';
     if (exitCode === 126) return 'PERMISSION_ERROR';
@@ -34,6 +34,11 @@ function AuditLogs() {
 
   const getContainerName = (log) => {
     try {
+      // 서버에서 추출한 container_name
+      if (log.container_name) {
+        return log.container_name;
+      }
+      
       // details에서 container_name 추출
       if (log.details && log.details.container_name) {
         return log.details.container_name;
@@ -1,4 +1,5 @@
 import React, { useState, useEffect } from 'react';
+import useEventFeed, { upsertItem, removeItem } from '../useEventFeed';
 
 const API_BASE = process.env.NODE_ENV === 'production' ? '' : 'http://localhost:8000';
 
@@ -94,6 +95,13 @@ function Containers() {
     fetchContainers();
   }, []);
 
+  // 컨테이너 상태 변경은 서버 push로 반영
+  useEventFeed(API_BASE, {
+    job: (container) => setContainers(prev => upsertItem(prev, container, 'job_id')),
+    'job.deleted': ({ job_id }) => setContainers(prev => removeItem(prev, 'job_id', job_id)),
+    reset: () => fetchContainers()
+  });
+
   return (
     <div className="containers-page">
       <div className="dashboard-stats">
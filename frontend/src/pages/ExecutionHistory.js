@@ -1,4 +1,5 @@
 import React, { useState, useEffect } from 'react';
+import useEventFeed, { upsertItem, removeItem } from '../useEventFeed';
 
 const API_BASE = process.env.NODE_ENV === 'production' ? '' : 'http://localhost:8000';
 
@@ -118,6 +119,13 @@ function ExecutionHistory() {
     fetchRuns();
   }, []);
 
+  // 새 실행 / 상태 변경은 서버 push로 반영
+  useEventFeed(API_BASE, {
+    run: (run) => setRuns(prev => upsertItem(prev, run, 'run_id')),
+    'run.deleted': ({ run_id }) => setRuns(prev => removeItem(prev, 'run_id', run_id)),
+    reset: () => fetchRuns()
+  });
+
   return (
     <div className="execution-history-page">
       <div className="section-header">
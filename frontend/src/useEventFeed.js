@@ -0,0 +1,41 @@
+import { useEffect, useRef } from 'react';
+
+// /api/events 이벤트 종류 (backend/main.py stream_events 참고)
+const EVENT_TYPES = ['run', 'run.deleted', 'audit', 'job', 'job.deleted', 'reset'];
+
+// 서버 push 이벤트 구독 (EventSource가 끊기면 Last-Event-ID로 자동 재접속)
+function useEventFeed(apiBase, handlers) {
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+
+  useEffect(() => {
+    const source = new EventSource(`${apiBase}/api/events`);
+    EVENT_TYPES.forEach(type => {
+      source.addEventListener(type, (event) => {
+        const handler = handlersRef.current[type];
+        if (handler) {
+          handler(JSON.parse(event.data || '{}'));
+        }
+      });
+    });
+    return () => source.close();
+  }, [apiBase]);
+}
+
+// key가 같은 항목은 교체, 없으면 맨 앞에 추가 (limit이 있으면 그 개수까지만 유지)
+export function upsertItem(items, item, key, limit) {
+  const index = items.findIndex(existing => existing[key] === item[key]);
+  if (index >= 0) {
+    const next = [...items];
+    next[index] = { ...items[index], ...item };
+    return next;
+  }
+  const next = [item, ...items];
+  return limit ? next.slice(0, limit) : next;
+}
+
+export function removeItem(items, key, value) {
+  return items.filter(item => item[key] !== value);
+}
+
+export default useEventFeed;
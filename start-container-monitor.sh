@@ -12,7 +12,7 @@ source venv/bin/activate
 pip install requests pytz
 
 echo "👀 Monitoring all Docker containers for automatic registration"
-echo "🔄 Will check every 30 seconds for completed containers"
+echo "📡 Watching docker events (MONITOR_MODE=poll for 5-second polling)"
 echo "⏹️ Press Ctrl+C to stop"
 echo ""
 